@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# import built-in modules
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.simulation import Simulation
+from trackswitchinggame.switchingpolicies import SwitchingPolicy, RandomSwitchingPolicy, RouteSwitchingPolicy
+
+APP_NAME = "Track Switching Game - Batch"
+APP_DESCRIPTION = "Run seeded headless sessions of a level in parallel, and aggregate their results."
+
+POLICIES = {policy.NAME: policy for policy in (SwitchingPolicy, RandomSwitchingPolicy, RouteSwitchingPolicy)}
+SUMMARY_FIELDS = ["score", "trains_done", "failed_platforms", "failed_exit_portals", "collisions",
+                  "trains_per_minute"]
+
+
+def parse_argv() -> dict:
+    """
+    Parse command-line arguments into a dict.
+    """
+    arg_parser = argparse.ArgumentParser(prog=APP_NAME, description=APP_DESCRIPTION)
+    arg_parser.add_argument("-l", "--level", type=str, required=True, dest="level", help="path of level to simulate")
+    arg_parser.add_argument("-n", "--sessions", type=int, required=False, default=os.cpu_count(), dest="sessions",
+                            help="number of sessions, one seed each")
+    arg_parser.add_argument("-s", "--seed", type=int, required=False, default=0, dest="seed",
+                            help="seed of the first session, the next sessions use the following seeds")
+    arg_parser.add_argument("-m", "--minutes", type=float, required=False, default=10.0, dest="minutes",
+                            help="simulated duration of each session, in minutes")
+    arg_parser.add_argument("-p", "--policy", type=str, required=False, default=RandomSwitchingPolicy.NAME,
+                            choices=list(POLICIES), dest="policy", help="switching policy of the automated player")
+    arg_parser.add_argument("-j", "--jobs", type=int, required=False, default=os.cpu_count(), dest="jobs",
+                            help="number of worker processes")
+    arg_parser.add_argument("-o", "--output", type=str, required=False, default=None, dest="output",
+                            help="file to write the results of each session to, as .jsonl or .csv")
+    args = arg_parser.parse_args()
+    args_dict = vars(args)
+    return args_dict
+
+
+def make_policy(name: str, seed: int) -> SwitchingPolicy:
+    if name == RandomSwitchingPolicy.NAME:
+        return RandomSwitchingPolicy(seed)
+    return POLICIES[name]()
+
+
+def run_session(level_file: str, seed: int, minutes: float, policy_name: str) -> dict:
+    """
+    Run a headless session as fast as possible, and return its results.
+    """
+    start_time = time.perf_counter()
+    simulation = Simulation(level_file, seed=seed)
+    policy = make_policy(policy_name, seed)
+    nb_steps = round(minutes * 60 * Simulation.STEPS_PER_SECOND)
+    for _ in range(nb_steps):
+        simulation.step()
+        for tile in policy.tiles_to_switch(simulation):
+            simulation.switch_tile(tile)
+
+    return {"level": level_file,
+            "seed": seed,
+            "policy": policy_name,
+            "minutes": minutes,
+            "score": simulation.score,
+            "speed": simulation.trains_speed,
+            "trains_done": simulation.nb_trains_done,
+            "failed_platforms": simulation.nb_failed_platforms,
+            "failed_exit_portals": simulation.nb_failed_exit_portals,
+            "collisions": simulation.nb_collisions,
+            "trains_per_minute": simulation.nb_trains_done / minutes,
+            "wall_time": time.perf_counter() - start_time}
+
+
+def _run_session(params: tuple) -> dict:
+    return run_session(*params)
+
+
+def write_results(results: list[dict], output_file: str):
+    """
+    Write one row per session, as JSON lines or as CSV depending on the file extension.
+    """
+    with open(output_file, "w", newline="") as f:
+        if output_file.endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+# Script starts here
+if __name__ == '__main__':
+    args = parse_argv()
+
+    print(f"{APP_NAME}: {args['sessions']} sessions of {args['minutes']} min on {args['level']}, "
+          f"{args['policy']} policy, {args['jobs']} jobs")
+
+    # Compile the level once, before the workers need it
+    Simulation(args["level"])
+
+    sessions = [(args["level"], seed, args["minutes"], args["policy"])
+                for seed in range(args["seed"], args["seed"] + args["sessions"])]
+    start_time = time.perf_counter()
+    with multiprocessing.Pool(args["jobs"]) as pool:
+        results = sorted(pool.imap_unordered(_run_session, sessions), key=lambda result: result["seed"])
+    elapsed_time = time.perf_counter() - start_time
+
+    if args["output"]:
+        write_results(results, args["output"])
+
+    for field in SUMMARY_FIELDS:
+        values = [result[field] for result in results]
+        print(f"{field:>20}: mean {statistics.mean(values):8.2f}  min {min(values):8.2f}  max {max(values):8.2f}")
+    simulated_time = args["sessions"] * args["minutes"] * 60
+    print(f"Simulated {simulated_time / 60:.0f} min in {elapsed_time:.1f} s ({simulated_time / elapsed_time:.0f}x "
+          f"real time)")
+
+    sys.exit()
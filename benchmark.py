@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+
+# import built-in modules
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, NamedTuple
+
+# Benchmarks run without a physical display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# import third-party modules
+import pygame as pg
+from pygame import Vector2
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.compiledlevel import CompiledLevel
+from trackswitchinggame.game import Game
+from trackswitchinggame.levelgenerator import LevelGenerator
+from trackswitchinggame.levelmap import LevelMap
+from trackswitchinggame.trainpool import TrainPool
+from trackswitchinggame.trainstates import TrainStates
+from trackswitchinggame.wagonsprite import WagonSprite
+
+APP_NAME = "Track Switching Game - Benchmark"
+APP_DESCRIPTION = "Measure the hot paths of the simulation and of the rendering, and compare them to a baseline."
+
+LEVELS = ["levels/freiburg.json", "levels/stuttgart21.json"]
+LARGE_LEVEL_SIZES = [(100, 40), (250, 100)]  # Columns and rows of the generated large levels
+TRAIN_COUNTS = [1, 10, 100, 500]
+STEPS_PER_ROUND = 30  # Train updates timed per round, from freshly spawned trains
+MIN_ROUND_TIME = 0.05  # In seconds, operations per round are calibrated to last at least this long
+SEED = 0
+
+
+class Benchmark(NamedTuple):
+    """
+    A benchmark: run() times one round of nb_operations operations, and returns its duration in seconds.
+    Benchmarks are built by suites, which only set up and calibrate the benchmarks selected by name.
+    """
+    name: str
+    run: Callable[[], float]
+    nb_operations: int
+
+
+def parse_argv() -> dict:
+    """
+    Parse command-line arguments into a dict.
+    """
+    arg_parser = argparse.ArgumentParser(prog=APP_NAME, description=APP_DESCRIPTION)
+    arg_parser.add_argument("-k", "--filter", type=str, required=False, default="", dest="filter",
+                            help="only run the benchmarks whose name contains this text")
+    arg_parser.add_argument("-r", "--rounds", type=int, required=False, default=15, dest="rounds",
+                            help="number of timed rounds of each benchmark")
+    arg_parser.add_argument("-w", "--warmup", type=int, required=False, default=3, dest="warmup",
+                            help="number of untimed rounds before the timed ones")
+    arg_parser.add_argument("-s", "--save", type=str, required=False, default=None, dest="save",
+                            help="save the results to this baseline JSON file")
+    arg_parser.add_argument("-c", "--compare", type=str, required=False, default=None, dest="compare",
+                            help="compare the results to this baseline JSON file")
+    arg_parser.add_argument("-t", "--threshold", type=float, required=False, default=0.10, dest="threshold",
+                            help="relative slowdown of the median over the baseline reported as a regression")
+    args = arg_parser.parse_args()
+    args_dict = vars(args)
+    return args_dict
+
+
+def timed(operation: Callable[[], object], number: int) -> Callable[[], float]:
+    """
+    Round function calling operation number times.
+    """
+    def run() -> float:
+        start_time = time.perf_counter()
+        for _ in range(number):
+            operation()
+        return time.perf_counter() - start_time
+    return run
+
+
+def calibrated(name: str, operation: Callable[[], object]) -> Benchmark:
+    """
+    Benchmark of operation, called enough times per round for a round to last at least MIN_ROUND_TIME.
+    """
+    number = 1
+    while timed(operation, number)() < MIN_ROUND_TIME:
+        number *= 2
+    return Benchmark(name, timed(operation, number), number)
+
+
+def generated_level(nb_cols: int, nb_rows: int, directory: str) -> str:
+    """
+    Write a generated level of the given size, and return its file. Its platform_portal_connections are left out, as
+    they are not needed to load the level.
+    """
+    level_file = os.path.join(directory, f"generated_{nb_cols}x{nb_rows}.json")
+    with open(level_file, "w") as f:
+        json.dump(LevelGenerator(nb_cols, nb_rows, SEED).generate(), f)
+    return level_file
+
+
+def level_benchmarks(levels: dict[str, Callable[[], str]], selected: Callable[[str], bool]) -> list[Benchmark]:
+    """
+    Compilation and loading of levels, given by name with a function returning their file. Level files are only
+    requested for selected benchmarks.
+    """
+    benchmarks = []
+    for name, get_level_file in levels.items():
+        compile_name, load_name = f"level_compile[{name}]", f"levelmap_load[{name}]"
+        if not selected(compile_name) and not selected(load_name):
+            continue
+        level_file = get_level_file()
+        with open(level_file) as f:
+            data = json.load(f)
+        if selected(compile_name):
+            benchmarks.append(calibrated(compile_name, lambda data=data: CompiledLevel.compile(data)))
+        if selected(load_name):
+            # The compiled level is then in memory, as for every level loaded after the first one
+            benchmarks.append(calibrated(load_name, lambda level_file=level_file: LevelMap(level_file)))
+    return benchmarks
+
+
+def tile_benchmarks(level_file: str, selected: Callable[[str], bool]) -> list[Benchmark]:
+    if not selected("tile_at") and not selected("switch_track"):
+        return []
+    level_map = LevelMap(level_file)
+    rng = random.Random(SEED)
+    positions = [Vector2(rng.uniform(0, level_map.nb_cols * TILE_LENGTH),
+                         rng.uniform(0, level_map.nb_rows * TILE_LENGTH)) for _ in range(1000)]
+
+    def tile_at():
+        for position in positions:
+            level_map.tile_at(position)
+
+    # Switching a tile re-renders its image, as when the tile is displayed
+    switch_tile = next(tile for tile in level_map.tiles.sprites() if len(tile.paths) > 1)
+    switch_tile.image
+
+    benchmarks = []
+    if selected("tile_at"):
+        benchmark = calibrated("tile_at", tile_at)
+        benchmarks.append(Benchmark(benchmark.name, benchmark.run, benchmark.nb_operations * len(positions)))
+    if selected("switch_track"):
+        benchmarks.append(calibrated("switch_track", switch_tile.switch_track))
+    return benchmarks
+
+
+def wagon_benchmarks(selected: Callable[[str], bool]) -> list[Benchmark]:
+    if not selected("wagon_update"):
+        return []
+    wagon = WagonSprite("assets/trains/ice_loc.png")
+    # Axle positions along a curve, so that different rotated images are used
+    axles = [(Vector2(x + 20, 16 + x / 4), Vector2(x, 16 + (x - 20) / 4)) for x in range(0, 640, 8)]
+
+    def wagon_update():
+        for position_axle_1, position_axle_2 in axles:
+            wagon.update(position_axle_1, position_axle_2)
+
+    benchmark = calibrated("wagon_update", wagon_update)
+    return [Benchmark(benchmark.name, benchmark.run, benchmark.nb_operations * len(axles))]
+
+
+def train_benchmarks(level_file: str, selected: Callable[[str], bool]) -> list[Benchmark]:
+    """
+    Updates of trains moving from the entry portals, one train at a time as Train.update() does, and all at once as
+    the simulation does. Times are per step of all trains.
+    """
+    train_counts = [nb_trains for nb_trains in TRAIN_COUNTS
+                    if selected(f"train_update[{nb_trains}]") or selected(f"train_states_update[{nb_trains}]")]
+    if not train_counts:
+        return []
+    level_map = LevelMap(level_file)
+    benchmarks = []
+    for nb_trains in train_counts:
+        now = [0]
+        states = TrainStates()
+        pool = TrainPool(level_map, lambda now=now: now[0], states)
+        goals = [(entry_portal, platform, exit_portal)
+                 for entry_portal in level_map.entry_portals
+                 for platform in sorted(level_map.platforms)
+                 for exit_portal in level_map.exit_portals]
+        trains = [pool.acquire(*goals[i % len(goals)]) for i in range(nb_trains)]
+
+        def spawn_trains(trains=trains, now=now):
+            for train in trains:
+                if train.spawned:
+                    train.despawn()
+                train.reset(train.entry_portal, train.platform, train.exit_portal)
+                train.spawn()
+            # Trains wait after spawning, they all start moving at the first update
+            now[0] += 10000
+
+        def train_update(trains=trains, spawn_trains=spawn_trains):
+            spawn_trains()
+            start_time = time.perf_counter()
+            for _ in range(STEPS_PER_ROUND):
+                for train in trains:
+                    train.update()
+            return time.perf_counter() - start_time
+
+        def train_states_update(trains=trains, states=states, spawn_trains=spawn_trains):
+            spawn_trains()
+            start_time = time.perf_counter()
+            for _ in range(STEPS_PER_ROUND):
+                states.update(trains)
+            return time.perf_counter() - start_time
+
+        benchmarks += [Benchmark(name, run, STEPS_PER_ROUND)
+                       for name, run in ((f"train_update[{nb_trains}]", train_update),
+                                         (f"train_states_update[{nb_trains}]", train_states_update))
+                       if selected(name)]
+    return benchmarks
+
+
+def frame_benchmarks(game: Game, selected: Callable[[str], bool]) -> list[Benchmark]:
+    """
+    Rendering of a frame by a game set up, with the trains of its simulation run for a while, fully and as dirty
+    rectangles.
+    """
+    if not selected("frame_full") and not selected("frame_dirty"):
+        return []
+    for _ in range(120 * game.simulation.STEPS_PER_SECOND):
+        game.simulation.step()
+
+    def draw(dirty_rects: bool):
+        game.dirty_rects = dirty_rects
+        game.draw()
+
+    return [calibrated(name, lambda dirty_rects=dirty_rects: draw(dirty_rects))
+            for name, dirty_rects in (("frame_full", False), ("frame_dirty", True)) if selected(name)]
+
+
+def run_benchmark(benchmark: Benchmark, nb_rounds: int, nb_warmup_rounds: int) -> dict:
+    """
+    Run a benchmark, and return the statistics of its time per operation over the rounds, in microseconds.
+    """
+    for _ in range(nb_warmup_rounds):
+        benchmark.run()
+    # As with timeit, the garbage collector does not run during the rounds
+    times = []
+    for _ in range(nb_rounds):
+        gc.collect()
+        gc.disable()
+        try:
+            times.append(benchmark.run() / benchmark.nb_operations * 1e6)
+        finally:
+            gc.enable()
+    times.sort()
+    quartiles = statistics.quantiles(times, n=4) if len(times) > 1 else times * 3
+    return {"min": times[0],
+            "median": statistics.median(times),
+            "mean": statistics.mean(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "iqr": quartiles[2] - quartiles[0],
+            "rounds": nb_rounds,
+            "operations": benchmark.nb_operations}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Print the change of each median from the baseline, and return the names of the regressed benchmarks. A benchmark
+    regresses if its median is slower than the baseline by more than threshold, and by more than the spread of both.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<36}{'-':>12}{result['median']:12.2f}{'new':>10}")
+            continue
+        reference = baseline[name]
+        change = result["median"] / reference["median"] - 1
+        noise = (result["iqr"] + reference["iqr"]) / reference["median"]
+        regressed = change > threshold and change > noise
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<36}{reference['median']:12.2f}{result['median']:12.2f}{change:+10.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+# Script starts here
+if __name__ == '__main__':
+    args = parse_argv()
+
+    print(f"{APP_NAME}: {args['rounds']} rounds after {args['warmup']} warm-up rounds, times per operation in µs")
+
+    # The display of the game is needed by the images of the other benchmarks, and can only be set up once
+    game = Game(seed=SEED)
+    game.setup(LEVELS[0])
+    with tempfile.TemporaryDirectory() as large_level_dir:
+        # Large levels are only generated if their benchmarks are selected
+        levels = {os.path.basename(level_file)[:-5]: lambda level_file=level_file: level_file for level_file in LEVELS}
+        for nb_cols, nb_rows in LARGE_LEVEL_SIZES:
+            levels[f"generated_{nb_cols}x{nb_rows}"] = \
+                lambda nb_cols=nb_cols, nb_rows=nb_rows: generated_level(nb_cols, nb_rows, large_level_dir)
+        suites = [lambda selected: level_benchmarks(levels, selected),
+                  lambda selected: tile_benchmarks(LEVELS[0], selected),
+                  wagon_benchmarks,
+                  lambda selected: train_benchmarks(LEVELS[0], selected),
+                  lambda selected: frame_benchmarks(game, selected)]
+
+        results = dict()
+        print(f"{'benchmark':<36}{'median':>10}{'min':>10}{'iqr':>10}{'stdev':>10}")
+        for suite in suites:
+            for benchmark in suite(lambda name: args["filter"] in name):
+                result = results[benchmark.name] = run_benchmark(benchmark, args["rounds"], args["warmup"])
+                print(f"{benchmark.name:<36}{result['median']:10.2f}{result['min']:10.2f}{result['iqr']:10.2f}"
+                      f"{result['stdev']:10.2f}")
+    pg.quit()
+
+    if args["save"]:
+        with open(args["save"], "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "pygame": pg.version.ver,
+                       "machine": platform.platform(),
+                       "results": results}, f, indent=2)
+
+    regressions = []
+    if args["compare"]:
+        with open(args["compare"]) as f:
+            regressions = compare(results, json.load(f)["results"], args["threshold"])
+        print(f"\n{len(regressions)} regression(s)" + (f": {', '.join(regressions)}" if regressions else ""))
+
+    sys.exit(1 if regressions else 0)
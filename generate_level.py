@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+# import built-in modules
+import argparse
+import sys
+import time
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.compiledlevel import CompiledLevel
+from trackswitchinggame.levelgenerator import LevelGenerator
+
+APP_NAME = "Track Switching Game - Level generator"
+APP_DESCRIPTION = "Generate a station level of any size, e.g. for scale and stress tests."
+
+
+def parse_argv() -> dict:
+    """
+    Parse command-line arguments into a dict.
+    """
+    arg_parser = argparse.ArgumentParser(prog=APP_NAME, description=APP_DESCRIPTION)
+    arg_parser.add_argument("output", type=str, help="path of the level file to write")
+    arg_parser.add_argument("-c", "--cols", type=int, required=False, default=40, dest="cols",
+                            help="number of columns of the level")
+    arg_parser.add_argument("-r", "--rows", type=int, required=False, default=12, dest="rows",
+                            help="number of rows of the level, one platform each")
+    arg_parser.add_argument("-s", "--seed", type=int, required=False, default=None, dest="seed",
+                            help="seed of the layout, random by default")
+    args = arg_parser.parse_args()
+    args_dict = vars(args)
+    return args_dict
+
+
+# Script starts here
+if __name__ == '__main__':
+    args = parse_argv()
+
+    start_time = time.perf_counter()
+    generator = LevelGenerator(args["cols"], args["rows"], args["seed"])
+    generator.write(args["output"])
+    elapsed_time = time.perf_counter() - start_time
+
+    level = CompiledLevel.load(args["output"])
+    print(f"{level.name}: {args['output']}, {len(level.entry_portals)} entry and {len(level.exit_portals)} exit "
+          f"portals, {len(level.platform_codes) - 1} platforms, generated in {elapsed_time:.1f} s")
+
+    sys.exit()
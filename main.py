@@ -23,6 +23,24 @@ def parse_argv() -> dict:
     arg_parser.add_argument("-l", "--level", type=str, dest="level", help="path of level to play")
     arg_parser.add_argument("-d", "--debug", action="store_true", required=False, default=False,
                             help="display debug logging lines")
+    arg_parser.add_argument("--dirty-rects", action="store_true", required=False, default=False,
+                            dest="dirty_rects", help="only update the changed areas of the screen")
+    arg_parser.add_argument("--fps", type=int, required=False, default=Game.FPS, dest="fps",
+                            help="maximum frame rate, 0 for uncapped")
+    arg_parser.add_argument("--time-scale", type=float, required=False, default=1.0, dest="time_scale",
+                            help="simulated time per real time, e.g. 2 to play twice as fast")
+    arg_parser.add_argument("--interpolate", action="store_true", required=False, default=False,
+                            dest="interpolate", help="interpolate train positions between simulation steps")
+    arg_parser.add_argument("--seed", type=int, required=False, default=None, dest="seed",
+                            help="seed of the random decisions of the game")
+    arg_parser.add_argument("--record", type=str, required=False, default=None, dest="record",
+                            help="record the game to a replay log file")
+    arg_parser.add_argument("--replay", type=str, required=False, default=None, dest="replay",
+                            help="play back a replay log file instead of playing")
+    arg_parser.add_argument("--profile", action="store_true", required=False, default=False, dest="profile",
+                            help="measure frame times, shown in an overlay toggled with F3")
+    arg_parser.add_argument("--telemetry", type=str, required=False, default=None, dest="telemetry",
+                            help="write a telemetry record of each simulation step to a JSON lines file")
     args = arg_parser.parse_args()
     args_dict = vars(args)
     return args_dict
@@ -44,7 +62,9 @@ if __name__ == '__main__':
     print(f"{APP_NAME} v{VERSION}")
 
     # Set-up and run game
-    game = Game()
+    game = Game(dirty_rects=args["dirty_rects"], fps=args["fps"], time_scale=args["time_scale"],
+                interpolate=args["interpolate"], seed=args["seed"], record_file=args["record"],
+                replay_file=args["replay"], profile=args["profile"], telemetry_file=args["telemetry"])
     game.run(args["level"])
 
     sys.exit()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+# import built-in modules
+import argparse
+import sys
+import time
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.replayplayer import ReplayPlayer
+
+APP_NAME = "Track Switching Game - Replay"
+APP_DESCRIPTION = "Re-simulate a replay log without display, as fast as possible, and check that it reproduces the " \
+                  "outcome of the recorded game."
+
+
+def parse_argv() -> dict:
+    """
+    Parse command-line arguments into a dict.
+    """
+    arg_parser = argparse.ArgumentParser(prog=APP_NAME, description=APP_DESCRIPTION)
+    arg_parser.add_argument("replay", type=str, help="path of the replay log")
+    arg_parser.add_argument("--to", type=int, required=False, default=None, dest="to",
+                            help="stop at this step instead of the end of the replay")
+    args = arg_parser.parse_args()
+    args_dict = vars(args)
+    return args_dict
+
+
+# Script starts here
+if __name__ == '__main__':
+    args = parse_argv()
+
+    start_time = time.perf_counter()
+    player = ReplayPlayer(args["replay"])
+    player.seek(player.nb_steps if args["to"] is None else args["to"])
+    elapsed_time = time.perf_counter() - start_time
+
+    simulation = player.simulation
+    print(f"{player.replay.level_file}, seed {player.replay.seed}: step {simulation.steps}/{player.nb_steps}")
+    print(f"score {simulation.score}, trains done {simulation.nb_trains_done}, failed platforms "
+          f"{simulation.nb_failed_platforms}, failed exit portals {simulation.nb_failed_exit_portals}, collisions "
+          f"{simulation.nb_collisions}")
+    print(f"Re-simulated in {elapsed_time:.2f} s ({simulation.steps / elapsed_time:.0f} steps/s)")
+
+    # A replay played until its end must reproduce the outcome of the recorded game
+    reproduced = True
+    if player.finished and player.replay.outcome is not None:
+        reproduced = simulation.outcome() == player.replay.outcome
+        print(f"Recorded outcome {'reproduced' if reproduced else 'NOT reproduced'}: {player.replay.outcome}")
+
+    sys.exit(0 if reproduced else 1)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import json
+import os
+
+# import third-party modules
+import pytest
+
+# import your own module
+
+# Simulations run headless, and assets are loaded relative to the repository root
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_dir(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+
+
+@pytest.fixture
+def write_level(tmp_path):
+    """
+    Write a level made of the given track tiles to a temporary file, and return the file.
+    """
+    def write(track_tiles: list[list[str]], entry_portals: list[str], exit_portals: list[str]) -> str:
+        level_file = tmp_path / "level.json"
+        level_file.write_text(json.dumps({"name": "Test level",
+                                          "author": "Tests",
+                                          "track_tiles": track_tiles,
+                                          "entry_portals": entry_portals,
+                                          "exit_portals": exit_portals}))
+        return str(level_file)
+    return write
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+
+# import third-party modules
+import pytest
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.simulation import Simulation
+from trackswitchinggame.wagonsprite import WagonSprite
+
+
+@pytest.fixture
+def simulation(write_level) -> Simulation:
+    # Two trains, spawned on two parallel tracks
+    level_file = write_level([["mm+A", "mm", "mm", "mm+1", "mm+1", "mm+1", "mm", "mm", "mm+B"],
+                              ["mm+C", "mm", "mm", "mm+2", "mm+2", "mm+2", "mm", "mm", "mm+D"]],
+                             entry_portals=["A", "C"], exit_portals=["B", "D"])
+    simulation = Simulation(level_file, seed=0, spawns={0: ("A", "1", "B"), 1: ("C", "2", "D")})
+    simulation.step()
+    simulation.step()
+    return simulation
+
+
+def place_train(train, x: float, y: float, angle: float = 0):
+    # Wagons side by side from x, centered on y
+    for i, wagon in enumerate(train.wagons.sprites()):
+        wagon.place(angle, x + wagon.length * (i + 0.5), y)
+
+
+def test_wagons_do_not_overlap_where_only_their_rects_do():
+    wagon = WagonSprite("assets/trains/ice_wagon.png")
+    wagon.place(0, 100, 100)
+    rotated_wagon = WagonSprite("assets/trains/ice_wagon.png")
+    rotated_wagon.place(45, 130, 80)
+    assert wagon.rect.colliderect(rotated_wagon.rect)
+    assert not wagon.overlaps(rotated_wagon)
+    rotated_wagon.place(45, 120, 88)
+    assert wagon.overlaps(rotated_wagon)
+
+
+def test_grazing_trains_do_not_collide(simulation):
+    train, other_train = simulation.trains
+    place_train(train, 0, 100)
+    place_train(other_train, 0, 100 + 16 - Simulation.COLLISION_DEPTH)
+    assert simulation._check_for_collisions() == []
+    place_train(other_train, 0, 100 + 16 - Simulation.COLLISION_DEPTH - 1)
+    assert len(simulation._check_for_collisions()) == 1
+
+
+def test_collision_is_reported_once_until_trains_separate(simulation):
+    train, other_train = simulation.trains
+    place_train(train, 0, 100)
+    place_train(other_train, 60, 100)
+    events = simulation._check_for_collisions()
+    assert [event.type for event in events] == [COLLISION]
+    assert set(events[0].trains) == {train, other_train}
+
+    # Wagons passing each other, touching and separating by less than the margin, are the same collision
+    for x in (90, 60, 90 + Simulation.SEPARATION_MARGIN - 1, 60):
+        place_train(other_train, x, 100)
+        assert simulation._check_for_collisions() == []
+
+    # Once separated, the trains can collide again
+    place_train(other_train, 90 + Simulation.SEPARATION_MARGIN, 100)
+    assert simulation._check_for_collisions() == []
+    place_train(other_train, 60, 100)
+    assert len(simulation._check_for_collisions()) == 1
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import json
+
+# import third-party modules
+import pytest
+
+# import your own module
+from trackswitchinggame.levelgenerator import LevelGenerator
+from trackswitchinggame.levelmap import LevelMap
+from trackswitchinggame.routinggraph import RoutingGraph
+
+
+@pytest.mark.parametrize("nb_cols, nb_rows", [(11, 1), (12, 2), (17, 5), (30, 12)])
+@pytest.mark.parametrize("seed", range(3))
+def test_connections_match_routing_graph(tmp_path, nb_cols, nb_rows, seed):
+    level_file = str(tmp_path / "level.json")
+    LevelGenerator(nb_cols, nb_rows, seed).write(level_file)
+    with open(level_file) as f:
+        connections = json.load(f)["platform_portal_connections"]
+    assert connections == RoutingGraph(LevelMap(level_file)).platform_portal_connections()
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import os
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.telemetrysink import TelemetrySink
+
+
+def test_rotation_keeps_files_under_max_bytes(tmp_path):
+    file = str(tmp_path / "telemetry.jsonl")
+    sink = TelemetrySink(file, max_bytes=40, backup_count=2)
+    for step in range(3):
+        sink.write({"step": step, "name": "Zürich"})  # 32 bytes
+    sink.close()
+    assert [os.path.getsize(path) for path in (file, f"{file}.1", f"{file}.2")] == [32, 32, 32]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.simulation import Simulation
+
+
+def test_tile_is_locked_while_exit_padding_overlaps_it(write_level):
+    # The exit tile has an alternative path, so that it can be switched while the train leaves the playing field
+    level_file = write_level([["mm+A", "mm", "mm", "mm", "mm+1", "mm+1", "mm+1", "mm", "mm", "mm", "mm+mu+B"]],
+                             entry_portals=["A"], exit_portals=["B"])
+    simulation = Simulation(level_file, seed=0, spawns={0: ("A", "1", "B")})
+    exit_tile = simulation.map.tile_at_cell(0, 10)
+    simulation.step()
+    train = simulation.trains[0]
+
+    nb_steps_on_exit_tile = 0
+    for _ in range(60 * Simulation.STEPS_PER_SECOND):
+        if not train.spawned:
+            break
+        if train.colliderect(exit_tile.rect):
+            nb_steps_on_exit_tile += 1
+            assert not simulation.switch_tile(exit_tile), f"Exit tile switched under a train at step {simulation.steps}"
+        simulation.step()
+    assert not train.spawned
+    assert nb_steps_on_exit_tile > 0
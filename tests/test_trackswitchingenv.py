@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+
+# import third-party modules
+import pytest
+
+# import your own module
+from trackswitchinggame.trackswitchingenv import TrackSwitchingEnv
+
+
+@pytest.mark.parametrize("action", [-1, "nb_actions"])
+def test_step_rejects_out_of_range_actions(action):
+    env = TrackSwitchingEnv("levels/freiburg.json")
+    env.reset(seed=0)
+    with pytest.raises(ValueError):
+        env.step(env.nb_actions if action == "nb_actions" else action)
+    assert env.simulation.steps == 0
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import glob
+import hashlib
+import json
+import os
+import zipfile
+
+# import third-party modules
+import numpy as np
+
+# import your own module
+from trackswitchinggame.constants import *
+
+
+class CompiledLevel:
+    """
+    Level file compiled to arrays: path, portal and platform of each cell, and pre-resolved neighbour links.
+    Compiled levels are cached next to their source, in a .npz file keyed by the hash of the source content, so that
+    the JSON does not have to be parsed again as long as it does not change. Loaded levels are also kept in memory for
+    the lifetime of the process.
+    """
+
+    FORMAT_VERSION = 1
+    NEIGHBOUR_OFFSETS = {NW: (-1, -1),
+                         N: (-1, 0),
+                         NE: (-1, +1),
+                         W: (0, -1),
+                         E: (0, +1),
+                         SW: (+1, -1),
+                         S: (+1, 0),
+                         SE: (+1, +1)}
+    NO_CELL = -1
+
+    _loaded = dict()  # Compiled levels already loaded by this process, keyed by content hash
+
+    def __init__(self, name: str, paths: np.ndarray, portals: np.ndarray, platforms: np.ndarray,
+                 neighbours: np.ndarray, path_codes: list[str], portal_codes: list[str], platform_codes: list[str],
+                 entry_portals: list[str], exit_portals: list[str], platform_portal_connections: dict):
+        self.name = name
+        self.paths = paths  # (rows, cols, 2) indices in path_codes of main and alternative path, 0 for none
+        self.portals = portals  # (rows, cols) indices in portal_codes, 0 for none
+        self.platforms = platforms  # (rows, cols) indices in platform_codes, 0 for none
+        self.neighbours = neighbours  # (rows, cols, 8) flat index of the neighbour cell in each direction, or NO_CELL
+        self.path_codes = path_codes
+        self.portal_codes = portal_codes
+        self.platform_codes = platform_codes
+        self.entry_portals = entry_portals
+        self.exit_portals = exit_portals
+        self.platform_portal_connections = platform_portal_connections
+        self.digest = None  # Hash of the content of the level file, once loaded from it
+
+    @classmethod
+    def load(cls, level_file: str) -> "CompiledLevel":
+        """
+        Compiled version of a level file, from memory or from the cache file if up-to-date, otherwise compiled from
+        the source and cached.
+        """
+        with open(level_file, "rb") as f:
+            source = f.read()
+        digest = hashlib.sha256(source).hexdigest()[:16]
+        try:
+            return cls._loaded[digest]
+        except KeyError:
+            pass
+
+        cache_file = cls.cache_file(level_file, digest)
+        try:
+            level = cls._read(cache_file)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            level = cls.compile(json.loads(source))
+            level._write(level_file, cache_file)
+        level.digest = digest
+        cls._loaded[digest] = level
+        return level
+
+    @staticmethod
+    def cache_file(level_file: str, digest: str) -> str:
+        return f"{level_file}.{digest}.npz"
+
+    @classmethod
+    def compile(cls, data: dict) -> "CompiledLevel":
+        """
+        Compile the content of a level file.
+        """
+        raw_map = data["track_tiles"]
+        nb_rows, nb_cols = len(raw_map), len(raw_map[0])
+        path_codes, portal_codes, platform_codes = [""], [""], [""]
+        code_indices = {id(codes): {"": 0} for codes in (path_codes, portal_codes, platform_codes)}
+        paths = np.zeros((nb_rows, nb_cols, 2), dtype=np.uint8)
+        portals = np.zeros((nb_rows, nb_cols), dtype=np.uint16)
+        platforms = np.zeros((nb_rows, nb_cols), dtype=np.uint16)
+
+        def code_index(codes, code):
+            indices = code_indices[id(codes)]
+            if code not in indices:
+                indices[code] = len(codes)
+                codes.append(code)
+            return indices[code]
+
+        for row_id, row in enumerate(raw_map):
+            for col_id, el in enumerate(row):
+                if el == "":
+                    continue
+                for param in el.split("+"):
+                    if len(param) == 2 and param.islower():
+                        # The first path is the main path, the next one the alternative path
+                        paths[row_id, col_id, 0 if paths[row_id, col_id, 0] == 0 else 1] = \
+                            code_index(path_codes, param)
+                    elif param.isdigit():
+                        platforms[row_id, col_id] = code_index(platform_codes, param)
+                    elif param:
+                        portals[row_id, col_id] = code_index(portal_codes, param)
+
+        # Neighbour links between non-empty cells
+        occupied = paths[..., 0] != 0
+        cell_ids = np.arange(nb_rows * nb_cols).reshape(nb_rows, nb_cols)
+        neighbours = np.full((nb_rows, nb_cols, len(cls.NEIGHBOUR_OFFSETS)), cls.NO_CELL, dtype=np.int32)
+        padded_ids = np.pad(np.where(occupied, cell_ids, cls.NO_CELL), 1, constant_values=cls.NO_CELL)
+        for i, (row_offset, col_offset) in enumerate(cls.NEIGHBOUR_OFFSETS.values()):
+            shifted = padded_ids[1 + row_offset:1 + row_offset + nb_rows, 1 + col_offset:1 + col_offset + nb_cols]
+            neighbours[..., i] = np.where(occupied, shifted, cls.NO_CELL)
+
+        return cls(data["name"], paths, portals, platforms, neighbours, path_codes, portal_codes, platform_codes,
+                   data["entry_portals"], data["exit_portals"], data.get("platform_portal_connections"))
+
+    @classmethod
+    def _read(cls, cache_file: str) -> "CompiledLevel":
+        with np.load(cache_file) as arrays:
+            metadata = json.loads(str(arrays["metadata"]))
+            if metadata["format_version"] != cls.FORMAT_VERSION:
+                raise ValueError(f"Unsupported compiled level format {metadata['format_version']}")
+            return cls(metadata["name"], arrays["paths"], arrays["portals"], arrays["platforms"],
+                       arrays["neighbours"], metadata["path_codes"], metadata["portal_codes"],
+                       metadata["platform_codes"], metadata["entry_portals"], metadata["exit_portals"],
+                       metadata["platform_portal_connections"])
+
+    def _write(self, level_file: str, cache_file: str):
+        metadata = {"format_version": self.FORMAT_VERSION,
+                    "name": self.name,
+                    "path_codes": self.path_codes,
+                    "portal_codes": self.portal_codes,
+                    "platform_codes": self.platform_codes,
+                    "entry_portals": self.entry_portals,
+                    "exit_portals": self.exit_portals,
+                    "platform_portal_connections": self.platform_portal_connections}
+        # The cache is only an optimization: a read-only level directory is not an error.
+        try:
+            for stale_file in glob.glob(glob.escape(level_file) + ".*.npz"):
+                os.remove(stale_file)
+            with open(cache_file + ".tmp", "wb") as f:
+                np.savez(f, metadata=np.array(json.dumps(metadata)), paths=self.paths, portals=self.portals,
+                         platforms=self.platforms, neighbours=self.neighbours)
+            os.replace(cache_file + ".tmp", cache_file)
+        except OSError:
+            pass
+
+    @property
+    def nb_rows(self) -> int:
+        return self.paths.shape[0]
+
+    @property
+    def nb_cols(self) -> int:
+        return self.paths.shape[1]
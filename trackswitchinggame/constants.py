@@ -25,3 +25,9 @@ SE = "SE"
 DEBUG = False
 FORWARD = "forward"
 BACKWARD = "backward"
+COLLISION = "COLLISION"
+SPAWN = "SPAWN"
+DESPAWN = "DESPAWN"
+SWITCH = "SWITCH"
+PLATFORM = "PLATFORM"
+EXIT_PORTAL = "EXIT_PORTAL"
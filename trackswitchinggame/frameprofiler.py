@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+from collections import deque
+import contextlib
+import time
+
+# import third-party modules
+import numpy as np
+import pygame as pg
+
+# import your own module
+from trackswitchinggame.resources import Resources
+
+
+class FrameProfiler:
+    """
+    Measures the time spent in named spans of code, e.g. with profiler.span("map"): ..., and keeps the time spent per
+    span and per frame over the last WINDOW frames, for percentiles. A span can be entered several times per frame, its
+    durations are then added up.
+    A disabled profiler measures nothing: its spans are a shared no-op context manager.
+    """
+
+    WINDOW = 300  # In frames
+    PERCENTILES = (50, 95, 99)
+    OVERLAY_REFRESH = 15  # Frames between two renderings of the overlay
+    OVERLAY_FONT_SIZE = 12
+
+    _NO_SPAN = contextlib.nullcontext()
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.overlay_visible = enabled
+        self._frame_times = dict()  # Time spent in each span during the current frame, in seconds
+        self._history = dict()  # Time spent in each span in the last frames, in milliseconds
+        self._frame_start = None
+        self._nb_frames = 0
+        self._overlay = None
+
+    def span(self, name: str):
+        """
+        Context manager measuring the time spent in it, as part of the span of given name.
+        """
+        if not self.enabled:
+            return self._NO_SPAN
+        return _Span(self._frame_times, name)
+
+    def end_frame(self):
+        """
+        Close the current frame: its span times are added to the history, with the total frame time as "frame".
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._frame_times["frame"] = now - self._frame_start
+        self._frame_start = now
+        for name in self._history.keys() | self._frame_times.keys():
+            try:
+                history = self._history[name]
+            except KeyError:
+                history = self._history[name] = deque(maxlen=self.WINDOW)
+            history.append(self._frame_times.get(name, 0) * 1000)
+        self._frame_times = dict()
+        self._nb_frames += 1
+
+    def percentiles(self) -> dict[str, tuple[float, ...]]:
+        """
+        PERCENTILES of the time spent per frame in each span, in milliseconds, over the last WINDOW frames.
+        """
+        return {name: tuple(np.percentile(history, self.PERCENTILES)) for name, history in self._history.items()}
+
+    def report(self) -> str:
+        """
+        Table of the percentiles of each span, slowest first.
+        """
+        header = "span".ljust(16) + "".join(f"p{percentile}".rjust(9) for percentile in self.PERCENTILES)
+        lines = [header + "  (ms)"]
+        for name, values in sorted(self.percentiles().items(), key=lambda item: -item[1][-1]):
+            lines.append(name.ljust(16) + "".join(f"{value:9.2f}" for value in values))
+        return "\n".join(lines)
+
+    def draw(self, surface: pg.Surface, position: tuple = (0, 0)) -> pg.Rect:
+        """
+        Draw the report on surface as an overlay, refreshed every OVERLAY_REFRESH frames. Returns the drawn area.
+        """
+        if self._overlay is None or self._nb_frames % self.OVERLAY_REFRESH == 0:
+            font = Resources.font("Courier New", self.OVERLAY_FONT_SIZE)
+            lines = [font.render(line, True, pg.Color("white")) for line in self.report().split("\n")]
+            self._overlay = pg.Surface((max(line.get_width() for line in lines) + 8,
+                                        sum(line.get_height() for line in lines) + 8))
+            self._overlay.set_alpha(200)
+            y = 4
+            for line in lines:
+                self._overlay.blit(line, (4, y))
+                y += line.get_height()
+        return surface.blit(self._overlay, position)
+
+
+class _Span:
+    """
+    Adds the time spent within it to a frame's time of a span.
+    """
+
+    __slots__ = ("_frame_times", "_name", "_start")
+
+    def __init__(self, frame_times: dict, name: str):
+        self._frame_times = frame_times
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._frame_times[self._name] = self._frame_times.get(self._name, 0) + time.perf_counter() - self._start
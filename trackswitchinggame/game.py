@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
 
 # import built-in module
-import random
-import json
+import math
 
 # import third-party modules
 import pygame as pg
@@ -10,91 +9,167 @@ from pygame.math import Vector2
 
 # import your own module
 from trackswitchinggame.constants import *
+from trackswitchinggame.compiledlevel import CompiledLevel
 from trackswitchinggame.levelmap import LevelMap
-from trackswitchinggame.train import Train
+from trackswitchinggame.simulation import Simulation
+from trackswitchinggame.replaylog import ReplayLog
+from trackswitchinggame.replayplayer import ReplayPlayer
 from trackswitchinggame.informationboard import InformationBoard
+from trackswitchinggame.frameprofiler import FrameProfiler
+from trackswitchinggame.telemetrysink import TelemetrySink
+from trackswitchinggame.resources import Resources
 
 
 class Game:
     """
     Game class. Start the game with the run() method.
+    The game logic is handled by a Simulation, the Game class handles user events and renders the simulation.
+    A game can be recorded to a replay log, and a replay log can be played back instead of playing. During playback,
+    the left and right arrow keys seek backward and forward.
+    When profiling, the time spent in each stage of the frames is measured, and shown in an overlay toggled with F3.
+    With a telemetry file, a record of each simulation step is written to it by a TelemetrySink.
     """
 
     FPS = 30
+    MAX_CATCH_UP_STEPS = 5  # Maximum simulation steps per frame (at time scale 1), when rendering falls behind
+    SEEK_STEPS = 10 * Simulation.STEPS_PER_SECOND  # Steps skipped by the arrow keys during playback
 
-    SPAWN_DELAY_VS_SPEED = {1: 15000,
-                            2: 12000,
-                            3: 9000,
-                            4: 7000,
-                            5: 5000}
-
-    def __init__(self):
+    def __init__(self, dirty_rects: bool = False, fps: int = FPS, time_scale: float = 1.0, interpolate: bool = False,
+                 seed: int = None, record_file: str = None, replay_file: str = None, profile: bool = False,
+                 telemetry_file: str = None):
         pg.init()
+        self.dirty_rects = dirty_rects  # Only push changed screen areas to the display
+        self.fps = fps  # Rendering frame rate cap, 0 for uncapped
+        self.time_scale = time_scale  # Simulated time per real time
+        self.interpolate = interpolate  # Draw trains between their last two simulated positions
+        self.seed = seed  # Seed of the simulation, random if None
+        self.record_file = record_file  # Replay log to record the game to
+        self.replay_file = replay_file  # Replay log to play back, instead of playing
+        self._player = None
+        self.profiler = FrameProfiler(enabled=profile)
+        self.telemetry_file = telemetry_file  # Telemetry records of each step are written to it
+        self._telemetry = None
+        self._screen_drawn = False
+        self._previous_rects = []
+        self._switched_rects = []
+        self._last_board_state = None
         self.screen = None
         self.running = False
         self.clock = None
-        self.map = None
-        self.trains = []
+        self.simulation = None
         self.info_board = None
-        self.trains_speed = 0
-        self.score = 0
         self.SCREEN_WIDTH = None
         self.SCREEN_HEIGHT = None
 
-    def run(self, level_file: str):
+    def run(self, level_file: str = None):
         """
-        Start the game.
+        Start the game. When playing back a replay, the level is the one of the replay.
         """
-        # We look for the map's nb of cols and rows before loading it, because the loading operation (via the loading
-        # of the tiles) requires the display video mode to be set.
-        with open(level_file) as f:
-            data = json.load(f)
-            nb_rows = len(data["track_tiles"])
-            nb_cols = len(data["track_tiles"][0])
-        self.SCREEN_WIDTH = nb_cols * TILE_LENGTH
-        self.SCREEN_HEIGHT = (nb_rows + 1) * TILE_LENGTH
-        self.screen = pg.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), flags=pg.RESIZABLE | pg.SCALED)
-        pg.display.set_caption("Track Switching Game")
-
-        # Initializing game entities
-        self.map = LevelMap(level_file)
-        self.trains = []
-        self.trains_speed = 1
-        self._spawn_new_train()
-
-        # Initializing game clock
-        self.clock = pg.time.Clock()
-
-        # Initializing information board
-        self.info_board = InformationBoard(self.SCREEN_WIDTH)
-        self.score = 0
+        self.setup(level_file)
 
         # Ready to go
         self.running = True
+        accumulator = 0
+        max_steps = self.MAX_CATCH_UP_STEPS * math.ceil(self.time_scale)
 
         # Game loop
         while self.running:
             # User events
-            self._handle_events()
+            with self.profiler.span("events"):
+                self._handle_events()
 
             # Update
-            self._update_speed()
-            self._update_trains()
-            self.info_board.update(self.map.level_name, self.score, self.trains_speed)
+            # The simulation advances by fixed timesteps, as many as needed to catch up with the elapsed time. If the
+            # simulation cannot keep up, the remaining time is dropped instead of accumulating indefinitely.
+            with self.profiler.span("wait"):
+                accumulator += self.clock.tick(self.fps) * self.time_scale
+            steps = 0
+            while accumulator >= Simulation.TIMESTEP and steps < max_steps:
+                self._step_simulation()
+                accumulator -= Simulation.TIMESTEP
+                steps += 1
+            if steps == max_steps:
+                accumulator = min(accumulator, Simulation.TIMESTEP)
 
             # Re-draw screen
-            self.screen.fill(pg.Color("white"))
-            self.map.draw(self.screen)
-            for train in self.trains:
-                train.draw(self.screen)
-            self.info_board.draw(self.screen, (0, 8*TILE_LENGTH))
-            pg.display.update()
-
-            self.clock.tick(self.FPS)
+            self.draw(min(accumulator / Simulation.TIMESTEP, 1) if self.interpolate else 1)
+            self.profiler.end_frame()
 
         # Game loop is over
         self.quit()
 
+    def setup(self, level_file: str = None):
+        """
+        Set the display up for a level, and initialize the game entities, without starting the game loop.
+        """
+        replay = None
+        if self.replay_file is not None:
+            replay = ReplayLog.read(self.replay_file)
+            level_file = replay.level_file
+
+        # We look for the map's nb of cols and rows before loading it, because the images of the game entities are
+        # converted for the display when loaded, which requires the display video mode to be set. The compiled level
+        # is kept in memory, so the map is then built without reading the level again.
+        level = CompiledLevel.load(level_file)
+        self.SCREEN_WIDTH = level.nb_cols * TILE_LENGTH
+        self.SCREEN_HEIGHT = (level.nb_rows + 1) * TILE_LENGTH
+        self.screen = pg.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), flags=pg.RESIZABLE | pg.SCALED)
+        pg.display.set_caption("Track Switching Game")
+        Resources.load_tiles()
+
+        # Initializing game entities
+        if replay is not None:
+            self._player = ReplayPlayer(replay)
+            self.simulation = self._player.simulation
+        else:
+            self.simulation = Simulation(level_file, seed=self.seed, record_file=self.record_file)
+        self.simulation.profiler = self.profiler
+        if self.telemetry_file is not None:
+            self._telemetry = TelemetrySink(self.telemetry_file)
+            self._telemetry.write({"level": level_file, "seed": self.simulation.seed, "replay": replay is not None})
+
+        # Initializing game clock
+        self.clock = pg.time.Clock()
+
+        # Initializing information board
+        self.info_board = InformationBoard(self.SCREEN_WIDTH)
+
+    def draw(self, alpha: float = 1):
+        """
+        Render the current state of the game to the display. Trains are drawn at alpha between their previous and
+        current position.
+        """
+        with self.profiler.span("board"):
+            self.info_board.update(self.map.level_name, self.score, self.trains_speed)
+        if self.dirty_rects and self._screen_drawn:
+            self._draw_dirty_rects(alpha)
+        else:
+            self._draw_full_screen(alpha)
+
+    def _step_simulation(self):
+        """
+        Advance the simulation by one step, or the replay being played back until its end.
+        """
+        if self._player is None:
+            self.simulation.step()
+        elif not self._player.finished:
+            self._switched_rects += [tile.rect.copy() for tile in self._player.step()]
+        else:
+            return
+        if self._telemetry is not None:
+            self._telemetry.record_step(self.simulation, self.clock.get_time() / 1000)
+
+    def _seek(self, step: int):
+        """
+        Seek the replay being played back to the given step. The screen is then fully re-drawn.
+        """
+        self._player.seek(step)
+        self.simulation = self._player.simulation
+        self.simulation.profiler = self.profiler
+        if self._telemetry is not None:
+            self._telemetry.sync(self.simulation)
+        self._screen_drawn = False
+
     def _handle_events(self):
         """
         Handle user events
@@ -102,96 +177,113 @@ class Game:
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 self.running = False
+            if event.type == pg.KEYDOWN and event.key == pg.K_F3 and self.profiler.enabled:
+                self.profiler.overlay_visible = not self.profiler.overlay_visible
+            if self._player is not None:
+                # Playing back a replay, only seeking is possible
+                if event.type == pg.KEYDOWN and event.key == pg.K_RIGHT:
+                    self._seek(self.simulation.steps + self.SEEK_STEPS)
+                elif event.type == pg.KEYDOWN and event.key == pg.K_LEFT:
+                    self._seek(self.simulation.steps - self.SEEK_STEPS)
+                continue
             if event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
                 mouse_position = pg.mouse.get_pos()
 
                 # Clicking on tile switches the track, if no train is currently on it.
                 clicked_tile = self.map.tile_at(Vector2(mouse_position))
-                if clicked_tile:
-                    for train in self.trains:
-                        if train.colliderect(clicked_tile.rect):
-                            break
-                    else:
-                        clicked_tile.switch_track()
+                if clicked_tile and self.simulation.switch_tile(clicked_tile):
+                    self._switched_rects.append(clicked_tile.rect.copy())
             if event.type == pg.KEYDOWN and event.key == pg.K_RETURN and DEBUG:
                 # Debug key to break execution
                 print("Breakpoint activated.")
 
-    def _update_trains(self):
-        """
-        Handles all updates for trains:
-        - spawn new trains
-        - calls .update() for all trains
-        - handles despawning and score counting
-        """
-        # Spawn new train
-        if pg.time.get_ticks() > self._last_train_spawned + self.SPAWN_DELAY_VS_SPEED[self.trains_speed]:
-            self._spawn_new_train()
-
-        for train in self.trains:
-            if train.spawned:
-                # Despawn trains outside of playing field
-                if not train.platform_status == PENDING and not train.exit_portal_status == PENDING:
-                    if not train.rect.colliderect(self.map.get_playing_field_rect()):
-                        train.despawn()
-                        if train.platform_status == SUCCEEDED:
-                            self.score += 1
-                        if train.exit_portal_status == SUCCEEDED:
-                            self.score += 1
-
-                # Check for collisions
-
-                # Update
-                train.update()
-
-    def _spawn_new_train(self):
-        """
-        Spawns a new randomly-generated train if the time increment has been reached.
-        """
-        # Randomly generate an entry portal, a platform, and an exit portal for a train, with the following rules:
-        # Entry portal should not be the exit portal for any train currently generated
-        # Target platform should not be a platform TO BE reached for any current train.
-
-        legal_entry_portals = self.map.entry_portals
-        legal_platforms = list(self.map.platforms.keys())
-        legal_exit_portals = self.map.exit_portals
-
-        for train in self.trains:
-            if train.spawned:
-                if train.exit_portal in legal_entry_portals:
-                    legal_entry_portals.remove(train.exit_portal)
-                if train.platform in legal_platforms and \
-                        train.platform_status == PENDING and \
-                        train.moving:
-                    legal_platforms.remove(train.platform)
-
-        platform = random.choice(legal_platforms)
-        entry_portal = random.choice(list(set(legal_entry_portals) &
-                                          set(self.map.platform_portal_connections[platform])))
-        exit_portal = random.choice(list(set(legal_exit_portals) &
-                                         set(self.map.platform_portal_connections[platform])))
-
-        new_train = Train(self.map, entry_portal, platform, exit_portal)
-        new_train.spawn()
-        new_train.speed = self.trains_speed
-        self.trains.append(new_train)
-        self._last_train_spawned = pg.time.get_ticks()
-
-    def _update_speed(self):
-        """
-        If certain criteria are met, change the trains speed.
-        """
-        if self.score >= 10:
-            self.trains_speed = 2
-        if self.score >= 20:
-            self.trains_speed = 3
-        if self.score >= 30:
-            self.trains_speed = 4
-        if self.score >= 40:
-            self.trains_speed = 5
+    def _draw_full_screen(self, alpha: float = 1):
+        """
+        Re-draw and push the whole screen. Trains are drawn at alpha between their previous and current position.
+        """
+        with self.profiler.span("map"):
+            self.map.draw(self.screen)
+        self._previous_rects = []
+        with self.profiler.span("trains"):
+            for train in self.trains:
+                self._previous_rects += train.draw(self.screen, alpha)
+        with self.profiler.span("board"):
+            self.info_board.draw(self.screen, self.info_board_position)
+        if self.profiler.overlay_visible:
+            self._previous_rects.append(self.profiler.draw(self.screen))
+        with self.profiler.span("display"):
+            pg.display.update()
+
+        self._screen_drawn = True
+        self._switched_rects = []
+        self._last_board_state = (self.map.level_name, self.score, self.trains_speed)
+
+    def _draw_dirty_rects(self, alpha: float = 1):
+        """
+        Re-draw only the areas which changed since the last frame, and push only these areas to the display.
+        Trains are drawn at alpha between their previous and current position.
+        """
+        # Erase trains at their previous position, and show switched tiles
+        restored_rects = self._previous_rects + self._switched_rects
+        with self.profiler.span("map"):
+            for rect in restored_rects:
+                self.map.draw_area(self.screen, rect)
+
+        # Draw trains at their new position
+        drawn_rects = []
+        with self.profiler.span("trains"):
+            for train in self.trains:
+                drawn_rects += train.draw(self.screen, alpha)
+
+        # The information board is only re-drawn if its content changed, or if a train was drawn over it
+        board_rect = pg.Rect(self.info_board_position, self.info_board.get_size())
+        board_state = (self.map.level_name, self.score, self.trains_speed)
+        if board_state != self._last_board_state or board_rect.collidelist(restored_rects + drawn_rects) != -1:
+            with self.profiler.span("board"):
+                self.info_board.draw(self.screen, board_rect.topleft)
+            restored_rects.append(board_rect)
+            self._last_board_state = board_state
+
+        if self.profiler.overlay_visible:
+            drawn_rects.append(self.profiler.draw(self.screen))
+
+        with self.profiler.span("display"):
+            pg.display.update(restored_rects + drawn_rects)
+
+        self._previous_rects = drawn_rects
+        self._switched_rects = []
 
     def quit(self):
         """
         Clean-up and quit the game.
         """
+        if self.simulation is not None and self.simulation.replay_log is not None:
+            self.simulation.replay_log.close(self.simulation.steps, self.simulation.outcome())
+        if self._telemetry is not None:
+            self._telemetry.close()
+        if self.profiler.enabled:
+            print(self.profiler.report())
         pg.quit()
+
+    @property
+    def map(self) -> LevelMap:
+        return self.simulation.map
+
+    @property
+    def info_board_position(self) -> tuple[int, int]:
+        """
+        The information board is right below the map.
+        """
+        return 0, self.map.nb_rows * TILE_LENGTH
+
+    @property
+    def trains(self) -> list:
+        return self.simulation.trains
+
+    @property
+    def score(self) -> int:
+        return self.simulation.score
+
+    @property
+    def trains_speed(self) -> int:
+        return self.simulation.trains_speed
@@ -8,6 +8,7 @@ from pygame.math import Vector2
 
 # import your own module
 from trackswitchinggame.constants import *
+from trackswitchinggame.resources import Resources
 
 
 class InformationBoard(pg.surface.Surface):
@@ -19,32 +20,32 @@ class InformationBoard(pg.surface.Surface):
         height = TILE_LENGTH
         super().__init__((width, height), **kwargs)
 
-        self._font = pg.font.SysFont("Verdana", 30)
-        self._bold_font = pg.font.SysFont("Verdana", 30)
-        self._bold_font.bold = True
-
-        self._score_label_text = self._bold_font.render("Score", True, pg.Color("white"))
-        self._speed_label_text = self._bold_font.render("Speed", True, pg.Color("white"))
+        self._score_label_text = Resources.text("Score", "Verdana", 30, pg.Color("white"), bold=True)
+        self._speed_label_text = Resources.text("Speed", "Verdana", 30, pg.Color("white"), bold=True)
+        self._state = None  # Content of the board, which is only re-rendered when it changes
 
     def update(self, level_name: str, score: int, speed: int):
+        if (level_name, score, speed) == self._state:
+            return
+        self._state = (level_name, score, speed)
         self.fill(pg.Color("darkblue"))
 
         # Level name
         level_name_offset = Vector2(1, 1)
-        level_name_text = self._font.render(level_name, True, pg.Color("white"))
+        level_name_text = Resources.text(level_name, "Verdana", 30, pg.Color("white"))
         self.blit(level_name_text, level_name_offset)
 
         # Score
         score_offset = Vector2(level_name_text.get_rect().width, 0) + Vector2(TILE_LENGTH, 1)
         self.blit(self._score_label_text, score_offset)
-        score_text = self._font.render(str(score), True, pg.Color("white"))
+        score_text = Resources.text(str(score), "Verdana", 30, pg.Color("white"))
         score_text_position = score_offset + Vector2(self._score_label_text.get_rect().width, 0) + Vector2(5, 0)
         self.blit(score_text, score_text_position)
 
         # Speed
         speed_offset = score_offset + Vector2(5*TILE_LENGTH, 1)
         self.blit(self._speed_label_text, speed_offset)
-        speed_text = self._font.render(str(speed), True, pg.Color("white"))
+        speed_text = Resources.text(str(speed), "Verdana", 30, pg.Color("white"))
         speed_text_position = speed_offset + Vector2(self._speed_label_text.get_rect().width, 0) + Vector2(5, 0)
         self.blit(speed_text, speed_text_position)
 
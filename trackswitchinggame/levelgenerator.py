@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import json
+import random
+
+# import third-party modules
+
+# import your own module
+
+
+class LevelGenerator:
+    """
+    Generates station levels of any size, in the format of the level files. Each row is a track between two portals,
+    with a platform in the middle: trains enter from the left on even rows and from the right on odd rows, and exit on
+    the other side. Between the portals and the platforms, bands of crossovers link adjacent rows, so that trains can
+    change rows on their way to their platform and to their exit portal.
+    The layout only depends on the size and the seed.
+    """
+
+    PLATFORM_LENGTH = 3  # In tiles
+    MIN_COLS = PLATFORM_LENGTH + 8  # Portal, plain track and a crossover band on each side of the platforms
+    CROSSOVERS = [("down", 0), ("down", 1), ("up", 0), ("up", 1)]  # Direction and parity of the first row of a band
+    MAX_GAP = 1  # Maximum number of plain columns between two bands of crossovers
+
+    def __init__(self, nb_cols: int, nb_rows: int, seed: int = None):
+        if nb_cols < self.MIN_COLS or nb_rows < 1:
+            raise ValueError(f"Levels have at least {self.MIN_COLS} columns and 1 row, not {nb_cols}x{nb_rows}")
+        self._nb_cols = nb_cols
+        self._nb_rows = nb_rows
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self._random = random.Random(self.seed)
+        self._bands = ([], [])  # Crossover bands of the last generated level, left and right of the platforms
+
+    def generate(self) -> dict:
+        """
+        Content of a level file, without platform_portal_connections.
+        """
+        tracks = [[["mm"] for _ in range(self._nb_cols)] for _ in range(self._nb_rows)]
+
+        # Crossover bands, between the portals and the platforms
+        first_platform_col = (self._nb_cols - self.PLATFORM_LENGTH) // 2
+        self._bands = (self._add_crossovers(tracks, 2, first_platform_col),
+                       self._add_crossovers(tracks, first_platform_col + self.PLATFORM_LENGTH, self._nb_cols - 2))
+
+        entry_portals = []
+        exit_portals = []
+        for row_id, row in enumerate(tracks):
+            for col_id in range(first_platform_col, first_platform_col + self.PLATFORM_LENGTH):
+                row[col_id].append(str(row_id + 1))
+            left_portal, right_portal = self._portal_name(2 * row_id), self._portal_name(2 * row_id + 1)
+            row[0].append(left_portal)
+            row[-1].append(right_portal)
+            entry_portals.append(left_portal if row_id % 2 == 0 else right_portal)
+            exit_portals.append(right_portal if row_id % 2 == 0 else left_portal)
+
+        return {"name": f"Generated {self._nb_cols}x{self._nb_rows} #{self.seed}",
+                "author": "Level generator",
+                "track_tiles": [["+".join(cell) for cell in row] for row in tracks],
+                "entry_portals": entry_portals,
+                "exit_portals": exit_portals}
+
+    def write(self, level_file: str):
+        """
+        Generate a level and write it to level_file, with its platform_portal_connections.
+        """
+        data = self.generate()
+        data["platform_portal_connections"] = self._platform_portal_connections()
+        with open(level_file, "w") as f:
+            json.dump(data, f)
+
+    def _platform_portal_connections(self) -> dict[str, list[str]]:
+        """
+        Portals connected to each platform of the last generated level, as found by RoutingGraph on its tracks, but
+        computed from its crossover bands: trains reach an interval of rows, which each band can only widen by a row.
+        """
+        left_bands, right_bands = self._bands
+        platforms = dict()  # Entry portals from which the platform of each row can be reached
+        for row_id in range(self._nb_rows):
+            if row_id % 2 == 0:
+                first_row, last_row = self._rows_reached(row_id, left_bands, forward=True)
+                entry_portal = self._portal_name(2 * row_id)
+            else:
+                first_row, last_row = self._rows_reached(row_id, reversed(right_bands), forward=False)
+                entry_portal = self._portal_name(2 * row_id + 1)
+            for platform_row in range(first_row, last_row + 1):
+                platforms.setdefault(platform_row, []).append(entry_portal)
+
+        connections = dict()
+        for row_id, entry_portals in platforms.items():
+            portals = list(entry_portals)
+            # Exit portals are on the right of even rows and on the left of odd rows, trains go back to the latter
+            first_row, last_row = self._rows_reached(row_id, right_bands, forward=True)
+            portals += [self._portal_name(2 * row + 1) for row in range(first_row, last_row + 1) if row % 2 == 0]
+            first_row, last_row = self._rows_reached(row_id, reversed(left_bands), forward=False)
+            portals += [self._portal_name(2 * row) for row in range(first_row, last_row + 1) if row % 2 == 1]
+            connections[str(row_id + 1)] = sorted(portals)
+        return {platform: connections[platform] for platform in sorted(connections)}
+
+    def _rows_reached(self, row_id: int, bands, forward: bool) -> tuple[int, int]:
+        """
+        First and last rows which a train on row_id can reach through bands, given in the order it goes through them.
+        """
+        first_row, last_row = row_id, row_id
+        for direction, parity in bands:
+            # Going forward, trains go down "down" bands, and up "up" bands. Going backward, it is the opposite.
+            if (direction == "down") == forward:
+                if last_row % 2 == parity and last_row + 1 < self._nb_rows:
+                    last_row += 1
+            elif first_row > 0 and (first_row - 1) % 2 == parity:
+                first_row -= 1
+        return first_row, last_row
+
+    def _add_crossovers(self, tracks: list, first_col: int, last_col: int) -> list[tuple[str, int]]:
+        """
+        Fill the columns from first_col to last_col (excluded) with bands of crossovers, each two columns wide. Returns
+        the direction and parity of the bands, from left to right.
+        """
+        bands = []
+        crossovers = []
+        col_id = first_col
+        while col_id + 2 <= last_col:
+            if not crossovers:
+                crossovers = list(self.CROSSOVERS)
+                self._random.shuffle(crossovers)
+            direction, parity = crossovers.pop()
+            bands.append((direction, parity))
+            for row_id in range(parity, self._nb_rows - 1, 2):
+                if direction == "down":
+                    tracks[row_id][col_id].append("md")
+                    tracks[row_id + 1][col_id + 1].append("um")
+                else:
+                    tracks[row_id + 1][col_id].append("mu")
+                    tracks[row_id][col_id + 1].append("dm")
+            col_id += 2 + self._random.randint(0, self.MAX_GAP)
+        return bands
+
+    @staticmethod
+    def _portal_name(index: int) -> str:
+        # A to Z, then AA, AB, ... as spreadsheet columns
+        name = ""
+        index += 1
+        while index > 0:
+            index, remainder = divmod(index - 1, 26)
+            name = chr(ord("A") + remainder) + name
+        return name
@@ -1,15 +1,17 @@
 # -*- coding: utf-8 -*-
 
 # import built-in module
+import copy
 from typing import Union
-import json
 
 # import third-party modules
 import pygame as pg
 from pygame import Vector2
 
 # import your own module
+from trackswitchinggame.compiledlevel import CompiledLevel
 from trackswitchinggame.tracktile import TrackTile
+from trackswitchinggame.tileoccupancy import TileOccupancy
 from trackswitchinggame.constants import *
 
 
@@ -20,17 +22,27 @@ class LevelMap:
 
     def __init__(self, level_file: str):
         self._tiles = pg.sprite.Group()
+        self._grid = list()  # Tiles indexed by [row][col], None for empty cells
         self._nb_rows = 0
         self._nb_cols = 0
+        self._background = None  # Pre-composited static layer, built on first draw
+        self._playing_field_rect = None  # Cached geometry, computed on first access
+        self._platform_rects = None
+        self._portal_rects = None
+        self._occupancy = TileOccupancy()
 
-        # Load level from file
-        with open(level_file) as f:
-            data = json.load(f)
-            self._entry_portals = data["entry_portals"]
-            self._exit_portals = data["exit_portals"]
-            self._platform_portal_connections = data["platform_portal_connections"]
-            self._parse_raw_map(data["track_tiles"])
-            self._level_name = data["name"]
+        # Load level from its compiled version. Compiled levels are shared by all maps of the process, so their lists
+        # are copied rather than shared with this map.
+        level = CompiledLevel.load(level_file)
+        self._entry_portals = list(level.entry_portals)
+        self._exit_portals = list(level.exit_portals)
+        self._platform_portal_connections = None
+        if level.platform_portal_connections is not None:
+            self._platform_portal_connections = {platform: list(portals) for platform, portals
+                                                 in level.platform_portal_connections.items()}
+        self._load_compiled_level(level)
+        self._level_name = level.name
+        self._level_digest = level.digest
 
         self._portals = dict()
         self._platforms = dict()
@@ -47,83 +59,173 @@ class LevelMap:
                     self._platforms[tile.platform] = pg.sprite.Group(tile)
 
     def draw(self, surf: pg.surface.Surface):
+        if self._background is None:
+            self._compose_background()
+        surf.blit(self._background, (0, 0))
+
+    def draw_area(self, surf: pg.surface.Surface, rect: pg.Rect):
+        """
+        Restore the static map layer within rect only.
+        """
+        if self._background is None:
+            self._compose_background()
+        rect = rect.clip(self._background.get_rect())
+        if rect:
+            surf.blit(self._background, rect, rect)
+
+    def switch_tile(self, tile: TrackTile):
+        """
+        Switch the track of a tile and patch the cached background accordingly.
+        """
+        tile.switch_track()
+        if self._background is not None:
+            self._background.blit(tile.image, tile.rect)
+
+    def _compose_background(self):
+        self._background = pg.Surface((self._nb_cols * TILE_LENGTH, self._nb_rows * TILE_LENGTH))
+        self._background.fill(pg.Color("white"))
         for tile in self.tiles.sprites():
-            surf.blit(tile.image, tile.rect)
+            self._background.blit(tile.image, tile.rect)
 
     def tile_at(self, pos: Vector2) -> Union[TrackTile, None]:
-        for tile in self.tiles.sprites():
-            if tile.rect.collidepoint(pos.x, pos.y):
-                return tile
+        return self.tile_at_cell(int(pos.y // TILE_LENGTH), int(pos.x // TILE_LENGTH))
+
+    def tile_at_cell(self, row: int, col: int) -> Union[TrackTile, None]:
+        if 0 <= row < self._nb_rows and 0 <= col < self._nb_cols:
+            return self._grid[row][col]
         return None
 
+    def __getstate__(self) -> dict:
+        # Copies re-build their background and cached geometry, which they must not share
+        state = self.__dict__.copy()
+        state.update(_background=None, _playing_field_rect=None, _platform_rects=None, _portal_rects=None)
+        return state
+
+    def __deepcopy__(self, memo: dict) -> "LevelMap":
+        # Tiles are linked to their neighbours, so copying them recursively through these links would exceed the
+        # recursion limit on most levels. All tiles are registered as copied first, then filled in one by one.
+        level_map = memo[id(self)] = LevelMap.__new__(LevelMap)
+        tiles = self._tiles.sprites()
+        for tile in tiles:
+            memo[id(tile)] = TrackTile.__new__(TrackTile)
+        for tile in tiles:
+            memo[id(tile)].__dict__.update(copy.deepcopy(tile.__getstate__(), memo))
+        level_map.__dict__.update(copy.deepcopy(self.__getstate__(), memo))
+        return level_map
+
     def get_playing_field_rect(self) -> pg.Rect:
-        pf_rect = None
-        for tile in self.tiles.sprites():
-            if not pf_rect:
-                pf_rect = tile.rect
-            else:
-                pf_rect = pf_rect.union(tile.rect)
-        return pf_rect
-
-    def _parse_raw_map(self, raw_map):
-        self._nb_rows = len(raw_map)
-        self._nb_cols = len(raw_map[0])
-        # create a TrackTile for each non-empty strings in raw_map
-        # place these TrackTile objects in a temporary array, as well as a permanent Group()
-        tiles_array = list()
-        for row_id, row in enumerate(raw_map):
-            tile_row = list()
-            for col_id, el in enumerate(row):
-                if el == "":
-                    tile_row.append(None)
-                else:
-                    tracktile_mainpath = None
-                    tracktile_altpath = None
-                    tracktile_portal = None
-                    tracktile_platform = None
-
-                    params = el.split("+")
-
-                    for param in params:
-                        if len(param) == 2:
-                            if not tracktile_mainpath:
-                                tracktile_mainpath = param
-                            else:
-                                tracktile_altpath = param
-                        elif len(param) == 1:
-                            if param.isdigit():
-                                tracktile_platform = param
-                            else:
-                                tracktile_portal = param
-                        else:
-                            pass
-                    new_tile = TrackTile(Vector2(col_id * TILE_LENGTH, row_id * TILE_LENGTH), tracktile_mainpath,
-                                         tracktile_altpath, tracktile_portal, tracktile_platform)
-                    tile_row.append(new_tile)
-                    self._tiles.add(new_tile)
-            tiles_array.append(tile_row)
-            del tile_row  # Check if necessary
-
-        # Find neighbours
-        neighbours_offset_map = {NW: Vector2(-TILE_LENGTH, -TILE_LENGTH),
-                                 N: Vector2(0, -TILE_LENGTH),
-                                 NE: Vector2(+TILE_LENGTH, -TILE_LENGTH),
-                                 W: Vector2(-TILE_LENGTH, 0),
-                                 E: Vector2(+TILE_LENGTH, 0),
-                                 SW: Vector2(-TILE_LENGTH, +TILE_LENGTH),
-                                 S: Vector2(0, +TILE_LENGTH),
-                                 SE: Vector2(+TILE_LENGTH, +TILE_LENGTH)}
-        for tile in self.tiles:
-            for compass_dir, offset in neighbours_offset_map.items():
-                tile_pos = Vector2(tile.rect.x, tile.rect.y)
-                neighbour_tile = self.tile_at(tile_pos + offset)
-                if neighbour_tile:
-                    tile.set_neighbour(compass_dir, neighbour_tile)
+        return self.playing_field_rect
+
+    def _invalidate_geometry(self):
+        self._playing_field_rect = None
+        self._platform_rects = None
+        self._portal_rects = None
+
+    def _reset_occupancy(self):
+        self._occupancy = TileOccupancy()
+
+    def platform_rect(self, platform: str) -> pg.Rect:
+        """
+        Copy of the rect of one platform, without copying the others as platform_rects does.
+        """
+        return self._cached_platform_rects()[platform].copy()
+
+    def portal_rect(self, portal: str) -> pg.Rect:
+        """
+        Copy of the rect of one portal, without copying the others as portal_rects does.
+        """
+        return self._cached_portal_rects()[portal].copy()
+
+    def platform_containing(self, rect: pg.Rect) -> Union[str, None]:
+        """
+        Platform whose rect contains rect, if any, without copying the platform rects.
+        """
+        for platform, platform_rect in self._cached_platform_rects().items():
+            if platform_rect.contains(rect):
+                return platform
+        return None
+
+    def portal_colliding(self, rect: pg.Rect) -> Union[str, None]:
+        """
+        First portal whose rect collides with rect, if any, without copying the portal rects.
+        """
+        for portal, portal_rect in self._cached_portal_rects().items():
+            if portal_rect.colliderect(rect):
+                return portal
+        return None
+
+    def _cached_platform_rects(self) -> dict[str, pg.Rect]:
+        if self._platform_rects is None:
+            self._platform_rects = {platform: self._union_rect(group.sprites())
+                                    for platform, group in self._platforms.items()}
+        return self._platform_rects
+
+    def _cached_portal_rects(self) -> dict[str, pg.Rect]:
+        if self._portal_rects is None:
+            self._portal_rects = {portal: self._union_rect(group.sprites()) for portal, group in self._portals.items()}
+        return self._portal_rects
+
+    @staticmethod
+    def _union_rect(tiles) -> pg.Rect:
+        rects = [tile.rect for tile in tiles]
+        return rects[0].unionall(rects[1:])
+
+    def _load_compiled_level(self, level: CompiledLevel):
+        self._invalidate_geometry()
+        self._reset_occupancy()
+        self._nb_rows = level.nb_rows
+        self._nb_cols = level.nb_cols
+        # create a TrackTile for each non-empty cell, placed in the grid as well as in a permanent Group()
+        self._grid = [[None] * self._nb_cols for _ in range(self._nb_rows)]
+        for row_id, col_id in zip(*level.paths[..., 0].nonzero()):
+            row_id, col_id = int(row_id), int(col_id)
+            main_path, alt_path = level.paths[row_id, col_id]
+            portal = level.portals[row_id, col_id]
+            platform = level.platforms[row_id, col_id]
+            new_tile = TrackTile(Vector2(col_id * TILE_LENGTH, row_id * TILE_LENGTH), level.path_codes[main_path],
+                                 level.path_codes[alt_path] if alt_path else None,
+                                 level.portal_codes[portal] if portal else None,
+                                 level.platform_codes[platform] if platform else None)
+            self._grid[row_id][col_id] = new_tile
+            self._tiles.add(new_tile)
+
+        # Link neighbours, already resolved by the level compiler
+        compass_dirs = list(CompiledLevel.NEIGHBOUR_OFFSETS)
+        for row_id, col_id, dir_id in zip(*(level.neighbours != CompiledLevel.NO_CELL).nonzero()):
+            neighbour_row, neighbour_col = divmod(int(level.neighbours[row_id, col_id, dir_id]), self._nb_cols)
+            self._grid[row_id][col_id].set_neighbour(compass_dirs[dir_id], self._grid[neighbour_row][neighbour_col])
 
     @property
     def tiles(self) -> pg.sprite.Group:
         return self._tiles
 
+    @property
+    def playing_field_rect(self) -> pg.Rect:
+        """
+        Rect containing all tiles. Returns a copy of the cached rect, which callers are free to modify.
+        """
+        if self._playing_field_rect is None:
+            self._playing_field_rect = self._union_rect(self.tiles.sprites())
+        return self._playing_field_rect.copy()
+
+    @property
+    def platform_rects(self) -> dict[str, pg.Rect]:
+        """
+        Rect containing all tiles of each platform, as copies of the cached rects.
+        """
+        return {platform: rect.copy() for platform, rect in self._cached_platform_rects().items()}
+
+    @property
+    def portal_rects(self) -> dict[str, pg.Rect]:
+        """
+        Rect containing all tiles of each portal, as copies of the cached rects.
+        """
+        return {portal: rect.copy() for portal, rect in self._cached_portal_rects().items()}
+
+    @property
+    def occupancy(self) -> TileOccupancy:
+        return self._occupancy
+
     @property
     def portals(self) -> dict:
         return self._portals
@@ -155,3 +257,10 @@ class LevelMap:
     @property
     def level_name(self) -> str:
         return self._level_name
+
+    @property
+    def level_digest(self) -> str:
+        """
+        Hash of the content of the level file, the same for all maps of a level.
+        """
+        return self._level_digest
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import json
+from typing import NamedTuple
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.tracktile import TrackTile
+
+
+class Replay(NamedTuple):
+    """
+    Content of a replay log: the level and seed of the simulation, the tile switches as lists of (row, col) keyed by
+    step, the spawns as (entry portal, platform, exit portal) keyed by step, the number of steps simulated, and the
+    outcome of the recorded simulation (see Simulation.outcome()) if it was recorded until its end.
+    """
+    level_file: str
+    seed: int
+    switches: dict
+    spawns: dict
+    nb_steps: int
+    outcome: dict = None
+
+
+class ReplayLog:
+    """
+    Append-only log of the inputs of a simulation: tile switches and spawn decisions, stamped with the step of the
+    simulation before which (switches) or during which (spawns) they happened. Together with the level and the seed, it
+    is enough to reproduce the simulation.
+    The log is a JSON lines file, starting with a header. Lines are written as soon as they are recorded, so that the
+    log is usable even if the game is not closed properly.
+    """
+
+    VERSION = 1
+
+    def __init__(self, file: str, level_file: str, seed: int):
+        self._file = open(file, "w", buffering=1)
+        self._write({"version": self.VERSION, "level": level_file, "seed": seed})
+
+    def record_switch(self, step: int, tile: TrackTile):
+        self._write({"step": step, "switch": [tile.rect.y // TILE_LENGTH, tile.rect.x // TILE_LENGTH]})
+
+    def record_spawn(self, step: int, entry_portal: str, platform: str, exit_portal: str):
+        self._write({"step": step, "spawn": [entry_portal, platform, exit_portal]})
+
+    def close(self, step: int, outcome: dict = None):
+        """
+        Record the number of steps simulated and the outcome of the simulation, to check replays against, and close the
+        log.
+        """
+        self._write({"step": step, "end": True, "outcome": outcome})
+        self._file.close()
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    @staticmethod
+    def read(file: str) -> Replay:
+        """
+        Read a replay log. Without end record, the replay ends at the last recorded step.
+        """
+        switches = dict()
+        spawns = dict()
+        nb_steps = 0
+        outcome = None
+        with open(file) as f:
+            header = json.loads(f.readline())
+            if header.get("version") != ReplayLog.VERSION:
+                raise ValueError(f"Unsupported replay log version {header.get('version')} in {file}")
+            for line in f:
+                record = json.loads(line)
+                step = record["step"]
+                if "switch" in record:
+                    switches.setdefault(step, []).append(tuple(record["switch"]))
+                elif "spawn" in record:
+                    spawns[step] = tuple(record["spawn"])
+                elif "end" in record:
+                    outcome = record.get("outcome")
+                nb_steps = max(nb_steps, step)
+        return Replay(header["level"], header["seed"], switches, spawns, nb_steps, outcome)
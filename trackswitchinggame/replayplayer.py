@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+from typing import Union
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.replaylog import Replay, ReplayLog
+from trackswitchinggame.simulation import Simulation
+from trackswitchinggame.tracktile import TrackTile
+
+
+class ReplayPlayer:
+    """
+    Re-simulates a replay, as fast as its steps are called. Snapshots of the simulation are taken at regular intervals
+    while playing, so that seeking only re-simulates from the closest snapshot before the target step.
+    The simulation being played is replaced when seeking: always access it through the simulation attribute.
+    """
+
+    SNAPSHOT_INTERVAL = 30 * Simulation.STEPS_PER_SECOND  # In steps
+
+    def __init__(self, replay: Union[Replay, str], snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self._replay = ReplayLog.read(replay) if isinstance(replay, str) else replay
+        self._snapshot_interval = snapshot_interval
+        self.simulation = Simulation(self._replay.level_file, seed=self._replay.seed, spawns=self._replay.spawns)
+        self._snapshots = {0: self.simulation.snapshot()}
+
+    def step(self) -> list[TrackTile]:
+        """
+        Apply the tile switches of the current step, advance the simulation by one step, and return the switched tiles.
+        """
+        switched_tiles = []
+        for row, col in self._replay.switches.get(self.simulation.steps, []):
+            tile = self.simulation.map.tile_at_cell(row, col)
+            if self.simulation.switch_tile(tile):
+                switched_tiles.append(tile)
+        self.simulation.step()
+        if self.simulation.steps % self._snapshot_interval == 0 and self.simulation.steps not in self._snapshots:
+            self._snapshots[self.simulation.steps] = self.simulation.snapshot()
+        return switched_tiles
+
+    def play(self):
+        """
+        Re-simulate until the end of the replay.
+        """
+        while not self.finished:
+            self.step()
+
+    def seek(self, step: int):
+        """
+        Bring the simulation to the given step, clamped to the replay.
+        """
+        step = max(0, min(step, self.nb_steps))
+        snapshot_step = max(snapshot_step for snapshot_step in self._snapshots if snapshot_step <= step)
+        if step < self.simulation.steps or snapshot_step > self.simulation.steps:
+            self.simulation = self._snapshots[snapshot_step].snapshot()
+        while self.simulation.steps < step:
+            self.step()
+
+    @property
+    def replay(self) -> Replay:
+        return self._replay
+
+    @property
+    def nb_steps(self) -> int:
+        return self._replay.nb_steps
+
+    @property
+    def finished(self) -> bool:
+        return self.simulation.steps >= self._replay.nb_steps
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+from collections import OrderedDict
+
+# import third-party modules
+import pygame as pg
+
+# import your own module
+
+
+class Resources:
+    """
+    Process-wide cache of the game assets. Assets are loaded once, and shared by all game entities.
+    Tile images are converted for the display, so loading them requires the display video mode to be set. Other images
+    are only converted if the display video mode is set when they are first loaded.
+    """
+
+    TILE_PATHS = ["dm", "du", "md", "mm", "mu", "ud", "um"]
+    INACTIVE_TILE_ALPHA = 128
+    TEXT_CACHE_SIZE = 256  # Rendered texts kept, the least recently used ones are evicted first
+
+    _tile_images = dict()
+    _inactive_tile_images = dict()
+    _images = dict()
+    _fonts = dict()
+    _texts = OrderedDict()
+
+    @classmethod
+    def load_tiles(cls):
+        """
+        Load all track tile images, as well as their half-transparent inactive versions.
+        """
+        for path in cls.TILE_PATHS:
+            image = pg.image.load(f"assets/tiles/{path}.png").convert_alpha()
+            inactive_image = image.copy()
+            inactive_image.set_alpha(cls.INACTIVE_TILE_ALPHA)
+            cls._tile_images[path] = image
+            cls._inactive_tile_images[path] = inactive_image
+
+    @classmethod
+    def tile_image(cls, path: str, inactive: bool = False) -> pg.Surface:
+        """
+        Image of the track for the given path (e.g. "mm", "md"). These surfaces are shared, do not modify them.
+        """
+        if not cls._tile_images:
+            cls.load_tiles()
+        if inactive:
+            return cls._inactive_tile_images[path]
+        return cls._tile_images[path]
+
+    @classmethod
+    def image(cls, file: str, flip: bool = False) -> pg.Surface:
+        """
+        Image loaded from file, optionally flipped horizontally. These surfaces are shared, do not modify them.
+        """
+        key = (file, flip)
+        try:
+            return cls._images[key]
+        except KeyError:
+            image = pg.image.load(file)
+            if pg.display.get_init() and pg.display.get_surface() is not None:
+                image = image.convert_alpha()
+            if flip:
+                image = pg.transform.flip(image, True, False)
+            cls._images[key] = image
+            return image
+
+    @classmethod
+    def font(cls, name: str, size: int, bold: bool = False) -> pg.font.Font:
+        """
+        System font of given name and size. These fonts are shared, do not change their style.
+        """
+        key = (name, size, bold)
+        try:
+            return cls._fonts[key]
+        except KeyError:
+            font = pg.font.SysFont(name, size)
+            font.bold = bold
+            cls._fonts[key] = font
+            return font
+
+    @classmethod
+    def text(cls, text: str, font_name: str, size: int, color, bold: bool = False) -> pg.Surface:
+        """
+        Anti-aliased text rendered with a system font, in the given color. These surfaces are shared, do not modify
+        them.
+        """
+        key = (text, font_name, size, bold, tuple(pg.Color(color)))
+        try:
+            cls._texts.move_to_end(key)
+            return cls._texts[key]
+        except KeyError:
+            surface = cls.font(font_name, size, bold).render(text, True, color)
+            cls._texts[key] = surface
+            if len(cls._texts) > cls.TEXT_CACHE_SIZE:
+                cls._texts.popitem(last=False)
+            return surface
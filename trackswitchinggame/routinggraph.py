@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+from collections import deque
+from typing import Union
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.levelmap import LevelMap
+from trackswitchinggame.tracktile import TrackTile
+
+
+class RoutingGraph:
+    """
+    Directed graph of the moves of trains from tile to tile, under every switch configuration, built from the paths of
+    the tiles and their position in the map.
+    A node is a tile entered by a train, with the direction of the train and the side of the tile ("u", "m" or "d")
+    through which it entered. A train going to its platform stops on the first platform it reaches, and a train going
+    to its exit portal stops on the first portal it reaches: routes end there.
+    Routes from each entry portal and from each platform are searched once, and kept for all later queries. The
+    moves from a node are only computed once a search reaches it, so that a graph is cheap to build on large levels.
+    """
+
+    ROW_OFFSET = {"u": -1, "m": 0, "d": +1}  # Row of the next tile, for a train leaving a tile through a side
+    OPPOSITE_SIDE = {"u": "d", "m": "m", "d": "u"}  # Side through which the train then enters the next tile
+
+    def __init__(self, levelmap: LevelMap):
+        self._map = levelmap
+        self._successors = dict()  # Next nodes of each node reached so far, with the path taken on the tile of the node
+        self._predecessors = dict()  # Previous nodes of each node reached so far by a backward search
+        self._platform_routes = dict()  # Shortest routes from each entry portal to each platform
+        self._exit_routes = dict()  # Shortest routes from each platform to each exit portal
+
+    def platforms_reachable_from(self, entry_portal: str) -> frozenset[str]:
+        return frozenset(self._routes_from_entry_portal(entry_portal))
+
+    def exit_portals_reachable_from(self, platform: str) -> frozenset[str]:
+        return frozenset(exit_portal for exit_portal in self._map.exit_portals
+                         if exit_portal in self._routes_from_platform(platform, self._exit_direction(platform,
+                                                                                                     exit_portal)))
+
+    def entry_portals_reaching(self, platform: str) -> frozenset[str]:
+        """
+        Entry portals from which platform can be reached. Found with a single backward search from the platform,
+        instead of searching from every entry portal.
+        """
+        start_nodes = {node: entry_portal for entry_portal in self._map.entry_portals
+                       for node in self._nodes_of(self._map.portals[entry_portal].sprites()[0],
+                                                  self._entry_portal_direction(entry_portal))}
+        nodes = [node for tile in self._map.platforms[platform].sprites() for direction in (FORWARD, BACKWARD)
+                 for node in self._nodes_of(tile, direction)]
+        entry_portals = set()
+        visited = set(nodes)
+        queue = deque(nodes)
+        while queue:
+            try:
+                previous_nodes = self._predecessors[queue[0]]
+            except KeyError:
+                previous_nodes = self._predecessors[queue[0]] = list(self._previous_nodes(queue[0]))
+            queue.popleft()
+            for previous_node in previous_nodes:
+                if previous_node in visited:
+                    continue
+                visited.add(previous_node)
+                if previous_node in start_nodes:
+                    entry_portals.add(start_nodes[previous_node])
+                # Trains stop on the first platform they reach, so routes do not go through other platforms
+                if previous_node[0].platform is None or previous_node in start_nodes:
+                    queue.append(previous_node)
+        return frozenset(entry_portals)
+
+    def is_reachable(self, entry_portal: str, platform: str, exit_portal: str = None) -> bool:
+        """
+        Whether a train spawned at entry_portal can reach platform, then exit_portal if given, with the right switches.
+        """
+        if platform not in self._routes_from_entry_portal(entry_portal):
+            return False
+        return exit_portal is None or exit_portal in self.exit_portals_reachable_from(platform)
+
+    def shortest_route(self, entry_portal: str, platform: str, exit_portal: str) -> Union[list, None]:
+        """
+        Shortest route from entry_portal to exit_portal through platform, as a list of (tile, path) pairs giving the
+        path to take on each tile, in the order the train goes through them. The route leaves the platform from the
+        tile at the front of the stopped train. None if there is no such route.
+        """
+        if not self.is_reachable(entry_portal, platform, exit_portal):
+            return None
+        route = list(self._routes_from_entry_portal(entry_portal)[platform])
+
+        # The train goes on until it covers the whole platform, then leaves it in the direction of its exit portal
+        direction = self._entry_portal_direction(entry_portal)
+        platform_tiles = self._sorted_platform_tiles(platform, direction)
+        for tile in platform_tiles[platform_tiles.index(route[-1][0]) + 1:]:
+            route.append((tile, tile.paths[0]))
+        exit_route = self._routes_from_platform(platform, self._exit_direction(platform, exit_portal))[exit_portal]
+        if exit_route[0][0] is route[-1][0]:
+            exit_route = exit_route[1:]
+        return route + exit_route
+
+    def platform_portal_connections(self) -> dict[str, list[str]]:
+        """
+        Portals connected to each platform, in the format of the "platform_portal_connections" of level files: the
+        entry portals from which the platform can be reached, and the exit portals which can be reached from it.
+        """
+        connections = dict()
+        for platform in sorted(self._map.platforms):
+            portals = {entry_portal for entry_portal in self._map.entry_portals
+                       if platform in self.platforms_reachable_from(entry_portal)}
+            portals |= self.exit_portals_reachable_from(platform)
+            connections[platform] = sorted(portals)
+        return connections
+
+    def _routes_from_entry_portal(self, entry_portal: str) -> dict[str, list]:
+        try:
+            return self._platform_routes[entry_portal]
+        except KeyError:
+            portal_tile = self._map.portals[entry_portal].sprites()[0]
+            routes = self._search(self._nodes_of(portal_tile, self._entry_portal_direction(entry_portal)),
+                                  lambda tile: tile.platform)
+            self._platform_routes[entry_portal] = routes
+            return routes
+
+    def _routes_from_platform(self, platform: str, direction: str) -> dict[str, list]:
+        # Trains leave a platform from its tile at the front of the train, in the direction of their exit portal.
+        try:
+            return self._exit_routes[(platform, direction)]
+        except KeyError:
+            front_tile = self._sorted_platform_tiles(platform, direction)[-1]
+            routes = self._search(self._nodes_of(front_tile, direction), lambda tile: tile.portal)
+            self._exit_routes[(platform, direction)] = routes
+            return routes
+
+    def _search(self, start_nodes: list, goal_of) -> dict[str, list]:
+        # Breadth-first search, which stops at the first goal reached on each branch. Returns the shortest route to each
+        # goal found, as (tile, path) pairs.
+        parents = {node: None for node in start_nodes}
+        routes = dict()
+        queue = deque(start_nodes)
+        while queue:
+            node = queue.popleft()
+            goal = goal_of(node[0])
+            if goal is not None and parents[node] is not None:
+                if goal not in routes:
+                    routes[goal] = self._route_to(node, parents)
+                continue
+            try:
+                successors = self._successors[node]
+            except KeyError:
+                successors = self._successors[node] = list(self._next_nodes(node))
+            for next_node, path in successors:
+                if next_node not in parents:
+                    parents[next_node] = (node, path)
+                    queue.append(next_node)
+        return routes
+
+    def _route_to(self, node: tuple, parents: dict) -> list:
+        tile, direction, side = node
+        route = [(tile, next(path for path in tile.paths if self._entry_side(path, direction) == side))]
+        while parents[node] is not None:
+            node, path = parents[node]
+            route.append((node[0], path))
+        route.reverse()
+        return route
+
+    def _next_nodes(self, node: tuple):
+        tile, direction, side = node
+        row, col = tile.rect.y // TILE_LENGTH, tile.rect.x // TILE_LENGTH
+        for path in tile.paths:
+            if self._entry_side(path, direction) != side:
+                continue
+            exit_side = path[1] if direction == FORWARD else path[0]
+            next_tile = self._map.tile_at_cell(row + self.ROW_OFFSET[exit_side],
+                                               col + 1 if direction == FORWARD else col - 1)
+            # Without next tile, the train leaves the playing field.
+            if next_tile is not None:
+                next_node = (next_tile, direction, self.OPPOSITE_SIDE[exit_side])
+                if any(self._entry_side(next_path, direction) == next_node[2] for next_path in next_tile.paths):
+                    yield next_node, path
+
+    def _previous_nodes(self, node: tuple):
+        # Nodes from which a train moves to node, as found by _next_nodes()
+        tile, direction, side = node
+        exit_side = self.OPPOSITE_SIDE[side]
+        row, col = tile.rect.y // TILE_LENGTH, tile.rect.x // TILE_LENGTH
+        previous_tile = self._map.tile_at_cell(row - self.ROW_OFFSET[exit_side],
+                                               col - 1 if direction == FORWARD else col + 1)
+        if previous_tile is not None:
+            for path in previous_tile.paths:
+                if (path[1] if direction == FORWARD else path[0]) == exit_side:
+                    yield previous_tile, direction, self._entry_side(path, direction)
+
+    def _nodes_of(self, tile: TrackTile, direction: str) -> list:
+        return [(tile, direction, side) for side in dict.fromkeys(self._entry_side(path, direction)
+                                                                  for path in tile.paths)]
+
+    def _sorted_platform_tiles(self, platform: str, direction: str) -> list[TrackTile]:
+        # Tiles of a platform, in the order a train going in direction goes through them
+        return sorted(self._map.platforms[platform].sprites(), key=lambda tile: tile.rect.x,
+                      reverse=direction == BACKWARD)
+
+    def _entry_portal_direction(self, entry_portal: str) -> str:
+        # Same rule as spawning trains: they go forward from a portal on the left edge of the map.
+        portal_tile = self._map.portals[entry_portal].sprites()[0]
+        if portal_tile.get_neighbour(NW) is None and portal_tile.get_neighbour(W) is None and \
+                portal_tile.get_neighbour(SW) is None:
+            return FORWARD
+        return BACKWARD
+
+    def _exit_direction(self, platform: str, exit_portal: str) -> str:
+        # Same rule as trains stopped at a platform: they go back if their exit portal is on their left.
+        platform_left = self._map.platform_rect(platform).left
+        if platform_left - self._map.portal_rect(exit_portal).centerx > 0:
+            return BACKWARD
+        return FORWARD
+
+    @staticmethod
+    def _entry_side(path: str, direction: str) -> str:
+        return path[0] if direction == FORWARD else path[1]
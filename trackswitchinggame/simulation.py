@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import copy
+import random
+from typing import Callable, NamedTuple
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.frameprofiler import FrameProfiler
+from trackswitchinggame.levelmap import LevelMap
+from trackswitchinggame.replaylog import ReplayLog
+from trackswitchinggame.routinggraph import RoutingGraph
+from trackswitchinggame.train import Train
+from trackswitchinggame.trainpool import TrainPool
+from trackswitchinggame.trainstates import TrainStates
+from trackswitchinggame.tracktile import TrackTile
+from trackswitchinggame.spatialhash import SpatialHash
+
+
+class SimulationEvent(NamedTuple):
+    """
+    Something which happened in a simulation: a train SPAWN or DESPAWN, a tile SWITCH, a COLLISION between trains, or
+    a train reaching a PLATFORM or an EXIT_PORTAL, with the new status of that goal.
+    """
+    type: str
+    trains: tuple = ()
+    tile: TrackTile = None
+    status: str = None
+
+
+class Simulation:
+    """
+    Game logic of a level: trains, switches and score, without any rendering.
+    The simulation advances by fixed timesteps with step(). By default, its clock only depends on the number of steps
+    taken, so it runs without a display and as fast as the steps can be computed. Another clock, returning a time in
+    milliseconds, can be injected.
+    Random decisions only depend on the seed, so a simulation can be reproduced from its seed and its tile switches.
+    Spawns can also be scripted, as a dict of (entry portal, platform, exit portal) keyed by step, e.g. from a replay.
+    With a record file, the simulation is recorded to a ReplayLog from its first spawn on.
+    """
+
+    STEPS_PER_SECOND = 30
+    TIMESTEP = 1000 / STEPS_PER_SECOND  # In milliseconds
+
+    SPAWN_DELAY_VS_SPEED = {1: 15000,
+                            2: 12000,
+                            3: 9000,
+                            4: 7000,
+                            5: 5000}
+
+    COLLISION_PENALTY = 0  # Points removed from the score for each collision between two trains
+    COLLISION_DEPTH = 4  # Trains only collide once wagons overlap by more than this, in pixels, not when grazing
+    SEPARATION_MARGIN = 4  # Colliding trains are only separated again once their wagons are this far apart, in pixels
+
+    # Entry and exit portals connected to each platform by an actual route, keyed by level content hash then by
+    # platform. They only depend on the level, and are shared by all simulations of a level in the process.
+    _reachable_portals = dict()
+
+    def __init__(self, level_file: str, clock: Callable[[], float] = None, seed: int = None,
+                 spawns: dict[int, tuple[str, str, str]] = None, record_file: str = None):
+        self._steps = 0
+        self._clock = clock if clock is not None else self._simulated_time
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self._random = random.Random(self.seed)
+        self._scripted_spawns = spawns
+        # If set, a ReplayLog recording the tile switches and spawns
+        self.replay_log = ReplayLog(record_file, level_file, self.seed) if record_file is not None else None
+        self.profiler = FrameProfiler(enabled=False)  # Measures the time spent in each part of a step
+
+        self.map = LevelMap(level_file)
+        self.routes = RoutingGraph(self.map)
+        self._train_states = TrainStates()
+        self._train_pool = TrainPool(self.map, self.now, self._train_states)
+        self.trains = []  # Spawned trains
+        self.trains_speed = 1
+        self.score = 0
+        self.nb_collisions = 0
+        self.nb_trains_done = 0  # Despawned trains, and how many of them failed their platform or exit portal goals
+        self.nb_failed_platforms = 0
+        self.nb_failed_exit_portals = 0
+        self.events = []  # Events of the last step, including the tiles switched right before it
+        self._new_events = []  # Events since the last step
+        self._spatial_hash = SpatialHash()
+        self._colliding_pairs = set()
+        self._last_train_spawned = 0
+        self._update_spawns(initial=True)
+
+    def step(self):
+        """
+        Advance the simulation by one timestep.
+        """
+        with self.profiler.span("update_speed"):
+            self._update_speed()
+        with self.profiler.span("update_trains"):
+            self._update_trains()
+        self._steps += 1
+        self.events = self._new_events
+        self._new_events = []
+
+    def now(self) -> float:
+        """
+        Current time of the simulation, in milliseconds.
+        """
+        return self._clock()
+
+    def switch_tile(self, tile: TrackTile) -> bool:
+        """
+        Switch the track of a tile, if it has an alternative path and is not in the track window of a train (see
+        TileOccupancy). Returns True if the track was switched.
+        """
+        if len(tile.paths) == 1 or self.map.occupancy.is_occupied(tile):
+            return False
+        self.map.switch_tile(tile)
+        self._new_events.append(SimulationEvent(SWITCH, tile=tile))
+        if self.replay_log is not None:
+            self.replay_log.record_switch(self._steps, tile)
+        return True
+
+    def outcome(self) -> dict:
+        """
+        Counters of the results of the simulation so far.
+        """
+        return {"score": self.score,
+                "trains_done": self.nb_trains_done,
+                "failed_platforms": self.nb_failed_platforms,
+                "failed_exit_portals": self.nb_failed_exit_portals,
+                "collisions": self.nb_collisions}
+
+    def snapshot(self) -> "Simulation":
+        """
+        Independent copy of the simulation in its current state, which can be stepped on its own. The replay log and the
+        profiler are not part of the copy, which gets a disabled profiler.
+        """
+        # The map is copied first, so that the tiles referenced by the trains are copied along with it
+        memo = dict()
+        copy.deepcopy(self.map, memo)
+        return copy.deepcopy(self, memo)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["replay_log"] = None
+        state["profiler"] = FrameProfiler(enabled=False)
+        return state
+
+    def _simulated_time(self) -> float:
+        return self._steps * self.TIMESTEP
+
+    def _update_trains(self):
+        """
+        Handles all updates for trains:
+        - spawn new trains
+        - calls .update() for all trains
+        - handles despawning, score counting, and recycling of despawned trains
+        - detects collisions between trains
+        """
+        # Spawn new train
+        self._update_spawns()
+
+        playing_field_rect = self.map.playing_field_rect
+        for train in self.trains:
+            # Despawn trains outside of playing field
+            if not train.platform_status == PENDING and not train.exit_portal_status == PENDING:
+                if not train.rect.colliderect(playing_field_rect):
+                    train.despawn()
+                    self._new_events.append(SimulationEvent(DESPAWN, (train,)))
+                    self.nb_trains_done += 1
+                    if train.platform_status == SUCCEEDED:
+                        self.score += 1
+                    else:
+                        self.nb_failed_platforms += 1
+                    if train.exit_portal_status == SUCCEEDED:
+                        self.score += 1
+                    else:
+                        self.nb_failed_exit_portals += 1
+
+        # Despawned trains are removed, and kept for re-use by future spawns
+        for train in self.trains:
+            if not train.spawned:
+                self._train_pool.release(train)
+        self.trains = [train for train in self.trains if train.spawned]
+
+        # Update all trains at once, and report the goals they reached
+        goal_statuses = [(train.platform_status, train.exit_portal_status) for train in self.trains]
+        self._train_states.update(self.trains)
+        for train, (platform_status, exit_portal_status) in zip(self.trains, goal_statuses):
+            if train.platform_status != platform_status:
+                self._new_events.append(SimulationEvent(PLATFORM, (train,), status=train.platform_status))
+            if train.exit_portal_status != exit_portal_status:
+                self._new_events.append(SimulationEvent(EXIT_PORTAL, (train,), status=train.exit_portal_status))
+
+        # Check for collisions
+        for event in self._check_for_collisions():
+            self.nb_collisions += 1
+            self.score -= self.COLLISION_PENALTY
+            self._new_events.append(event)
+
+    def _check_for_collisions(self) -> list[SimulationEvent]:
+        """
+        Find the pairs of trains which started overlapping during this step. Candidate pairs are found with a spatial
+        hash on the tile grid, and only these are tested wagon by wagon, on the footprints of the rotated wagons.
+        A collision is only reported once, when the wagons of two trains overlap by more than COLLISION_DEPTH. The
+        trains then stay colliding until they are SEPARATION_MARGIN apart, so that wagons passing each other do not
+        report it again.
+        """
+        margin = self.SEPARATION_MARGIN
+        train_rects = [train.rect.inflate(margin, margin) for train in self.trains]
+        self._spatial_hash.clear()
+        for i, rect in enumerate(train_rects):
+            self._spatial_hash.insert(i, rect)
+
+        colliding_pairs = set()
+        for i, j in self._spatial_hash.candidate_pairs():
+            if not train_rects[i].colliderect(train_rects[j]):
+                continue
+            train, other_train = self.trains[i], self.trains[j]
+            pair = (train, other_train) if train.slot < other_train.slot else (other_train, train)
+            pair_margin = margin if pair in self._colliding_pairs else -self.COLLISION_DEPTH
+            if self._trains_overlap(train, other_train, pair_margin):
+                colliding_pairs.add(pair)
+
+        new_pairs = colliding_pairs - self._colliding_pairs
+        self._colliding_pairs = colliding_pairs
+        return [SimulationEvent(COLLISION, pair) for pair in new_pairs]
+
+    @staticmethod
+    def _trains_overlap(train: Train, other_train: Train, margin: float) -> bool:
+        # Wagon rects bound the footprints, and rule out most pairs of wagons before testing their footprints
+        other_wagons = other_train.wagons.sprites()
+        for wagon in train.wagons.sprites():
+            wagon_rect = wagon.rect.inflate(2 * max(margin, 0), 2 * max(margin, 0))
+            for other_wagon in other_wagons:
+                if wagon_rect.colliderect(other_wagon.rect) and wagon.overlaps(other_wagon, margin):
+                    return True
+        return False
+
+    def _update_spawns(self, initial: bool = False):
+        """
+        Spawn a new train when the spawn delay is over, or at the steps of the scripted spawns if any. The initial
+        train is recorded at step 0, so a scripted one is only spawned by the first step.
+        """
+        if self._scripted_spawns is not None:
+            if not initial and self._steps in self._scripted_spawns:
+                self._spawn_train(*self._scripted_spawns[self._steps])
+        elif initial or self.now() > self._last_train_spawned + self.SPAWN_DELAY_VS_SPEED[self.trains_speed]:
+            self._spawn_new_train()
+
+    def _spawn_new_train(self):
+        """
+        Spawns a new randomly-generated train, if a legal one exists.
+        """
+        # Randomly generate an entry portal, a platform, and an exit portal for a train, with the following rules:
+        # Entry portal should not be the exit portal for any train currently generated
+        # Target platform should not be a platform TO BE reached for any current train.
+
+        legal_entry_portals = list(self.map.entry_portals)
+        legal_platforms = list(self.map.platforms.keys())
+        legal_exit_portals = list(self.map.exit_portals)
+
+        for train in self.trains:
+            if train.exit_portal in legal_entry_portals:
+                legal_entry_portals.remove(train.exit_portal)
+            if train.platform in legal_platforms and \
+                    train.platform_status == PENDING and \
+                    train.moving:
+                legal_platforms.remove(train.platform)
+
+        # Only portals connected to the platform, with an actual route through the tracks, are considered. Platforms
+        # are drawn until one has such portals, so that only the portals of the drawn platforms are looked up.
+        while legal_platforms:
+            platform = self._random.choice(legal_platforms)
+            entry_portals, exit_portals = self._spawn_portals(platform, legal_entry_portals, legal_exit_portals)
+            if entry_portals and exit_portals:
+                self._spawn_train(self._random.choice(entry_portals), platform, self._random.choice(exit_portals))
+                return
+            legal_platforms.remove(platform)
+        # If no legal train can be generated currently, we try again at the next step.
+
+    def _spawn_train(self, entry_portal: str, platform: str, exit_portal: str):
+        new_train = self._train_pool.acquire(entry_portal, platform, exit_portal)
+        new_train.spawn()
+        new_train.speed = self.trains_speed
+        self.trains.append(new_train)
+        self._last_train_spawned = self.now()
+        self._new_events.append(SimulationEvent(SPAWN, (new_train,)))
+        if self.replay_log is not None:
+            self.replay_log.record_spawn(self._steps, entry_portal, platform, exit_portal)
+
+    def _spawn_portals(self, platform: str, legal_entry_portals: list[str],
+                       legal_exit_portals: list[str]) -> tuple[list[str], list[str]]:
+        """
+        Legal entry portals from which platform can be reached, and legal exit portals which can be reached from it.
+        """
+        entry_portals, exit_portals = self._reachable_portals_of(platform)
+        return sorted(set(legal_entry_portals) & entry_portals), sorted(set(legal_exit_portals) & exit_portals)
+
+    def _reachable_portals_of(self, platform: str) -> tuple[frozenset[str], frozenset[str]]:
+        """
+        Entry portals from which platform can be reached, and exit portals which can be reached from it, looked up in
+        the routing graph once per level and process. Levels without platform_portal_connections only rely on the
+        routing graph.
+        """
+        level_portals = self._reachable_portals.setdefault(self.map.level_digest, dict())
+        try:
+            return level_portals[platform]
+        except KeyError:
+            pass
+        if self.map.platform_portal_connections is not None:
+            connected_portals = set(self.map.platform_portal_connections[platform])
+        else:
+            connected_portals = set(self.map.entry_portals) | set(self.map.exit_portals)
+        level_portals[platform] = (frozenset(connected_portals & self.routes.entry_portals_reaching(platform)),
+                                   frozenset(connected_portals & self.routes.exit_portals_reachable_from(platform)))
+        return level_portals[platform]
+
+    def _update_speed(self):
+        """
+        If certain criteria are met, change the trains speed.
+        """
+        if self.score >= 10:
+            self.trains_speed = 2
+        if self.score >= 20:
+            self.trains_speed = 3
+        if self.score >= 30:
+            self.trains_speed = 4
+        if self.score >= 40:
+            self.trains_speed = 5
+
+    @property
+    def steps(self) -> int:
+        return self._steps
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+from itertools import combinations
+
+# import third-party modules
+import pygame as pg
+
+# import your own module
+from trackswitchinggame.constants import *
+
+
+class SpatialHash:
+    """
+    Uniform grid of square cells, mapping each cell to the items whose rect overlaps it. Only items sharing a cell can
+    overlap, so finding overlapping items does not require testing all pairs.
+    """
+
+    def __init__(self, cell_size: int = TILE_LENGTH):
+        self._cell_size = cell_size
+        self._cells = dict()
+
+    def clear(self):
+        self._cells.clear()
+
+    def insert(self, item, rect: pg.Rect):
+        first_col, first_row = rect.left // self._cell_size, rect.top // self._cell_size
+        last_col, last_row = (rect.right - 1) // self._cell_size, (rect.bottom - 1) // self._cell_size
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                try:
+                    self._cells[(col, row)].append(item)
+                except KeyError:
+                    self._cells[(col, row)] = [item]
+
+    def candidate_pairs(self) -> set:
+        """
+        Pairs of items sharing at least one cell, each pair given once, in insertion order. Each item must only be
+        inserted once.
+        """
+        pairs = set()
+        for items in self._cells.values():
+            if len(items) > 1:
+                pairs.update(combinations(items, 2))
+        return pairs
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import random
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.simulation import Simulation
+from trackswitchinggame.tracktile import TrackTile
+
+
+class SwitchingPolicy:
+    """
+    Automated player, which decides which tiles to switch after each step of a simulation.
+    """
+
+    NAME = "none"
+
+    def tiles_to_switch(self, simulation: Simulation) -> list[TrackTile]:
+        return []
+
+
+class RandomSwitchingPolicy(SwitchingPolicy):
+    """
+    Switches a random switching tile at a fixed interval.
+    """
+
+    NAME = "random"
+
+    def __init__(self, seed: int = None, interval: int = Simulation.STEPS_PER_SECOND):
+        self._random = random.Random(seed)
+        self._interval = interval  # In simulation steps
+        self._switch_tiles = None
+
+    def tiles_to_switch(self, simulation: Simulation) -> list[TrackTile]:
+        if simulation.steps % self._interval:
+            return []
+        if self._switch_tiles is None:
+            self._switch_tiles = sorted((tile for tile in simulation.map.tiles.sprites() if len(tile.paths) > 1),
+                                        key=lambda tile: (tile.rect.y, tile.rect.x))
+        return [self._random.choice(self._switch_tiles)] if self._switch_tiles else []
+
+
+class RouteSwitchingPolicy(SwitchingPolicy):
+    """
+    Sets the switches ahead of each train along its shortest route, from the routing graph of the simulation. Older
+    trains have priority over the tiles of their routes.
+    """
+
+    NAME = "routes"
+
+    def __init__(self):
+        self._progress = dict()  # Route of each train, and index in the route of its leading tile
+
+    def tiles_to_switch(self, simulation: Simulation) -> list[TrackTile]:
+        occupancy = simulation.map.occupancy
+        self._progress = {train: self._progress.get(train) for train in simulation.trains}
+        claimed_tiles = set()
+        tiles_to_switch = []
+        for train in simulation.trains:
+            if self._progress[train] is None:
+                route = simulation.routes.shortest_route(train.entry_portal, train.platform, train.exit_portal)
+                self._progress[train] = (route, 0)
+            route, index = self._progress[train]
+            if route is None:
+                continue
+
+            # The train moves along its route, tile by tile
+            while index + 1 < len(route) and train in occupancy.trains_on(route[index + 1][0]):
+                index += 1
+            self._progress[train] = (route, index)
+
+            for tile, path in route[index + 1:]:
+                if tile in claimed_tiles:
+                    continue
+                claimed_tiles.add(tile)
+                if tile.get_trajectory().path != path and not occupancy.is_occupied(tile):
+                    tiles_to_switch.append(tile)
+        return tiles_to_switch
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import json
+import os
+import threading
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.simulation import Simulation
+
+
+class TelemetrySink:
+    """
+    Writes compact telemetry records to a JSON lines file, rotated once it exceeds max_bytes: file is renamed to
+    file.1, file.1 to file.2, and so on up to file.backup_count.
+    Records are only buffered by write(), a background thread writes them to disk in batches every flush_interval
+    seconds, so that the game loop never waits on the disk.
+    """
+
+    MAX_BYTES = 10 * 1024 * 1024
+    BACKUP_COUNT = 5
+    FLUSH_INTERVAL = 1.0  # In seconds
+
+    def __init__(self, file: str, max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self._file_name = file
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._flush_interval = flush_interval
+        self._buffer = []
+        self._last_score = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._file = open(file, "ab")
+        self._thread = threading.Thread(target=self._run, name="TelemetrySink", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict):
+        """
+        Buffer a record, to be written by the background thread.
+        """
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self._buffer.append(line)
+
+    def sync(self, simulation: Simulation):
+        """
+        Take the score of simulation as the reference of the next score change, after it was replaced or seeked.
+        """
+        self._last_score = simulation.score
+
+    def record_step(self, simulation: Simulation, frame_time: float):
+        """
+        Buffer the record of the last step of simulation, with the duration of the frame in which it happened, in
+        seconds. Events and score changes are only present if any.
+        """
+        record = {"step": simulation.steps,
+                  "frame_ms": round(frame_time * 1000, 2),
+                  "trains": len(simulation.trains),
+                  "score": simulation.score}
+        if simulation.score != self._last_score:
+            record["score_delta"] = simulation.score - self._last_score
+            self._last_score = simulation.score
+        for event in simulation.events:
+            if event.type == SWITCH:
+                record.setdefault("switches", []).append([event.tile.rect.y // TILE_LENGTH,
+                                                          event.tile.rect.x // TILE_LENGTH])
+            elif event.type == SPAWN:
+                train = event.trains[0]
+                record.setdefault("spawns", []).append([train.entry_portal, train.platform, train.exit_portal])
+            elif event.type == DESPAWN:
+                record["despawns"] = record.get("despawns", 0) + 1
+            elif event.type == COLLISION:
+                record["collisions"] = record.get("collisions", 0) + 1
+            elif event.type in (PLATFORM, EXIT_PORTAL):
+                key = f"{event.type.lower()}_{'ok' if event.status == SUCCEEDED else 'failed'}"
+                record[key] = record.get(key, 0) + 1
+        self.write(record)
+
+    def close(self):
+        """
+        Write the remaining records, and stop the background thread.
+        """
+        self._closed.set()
+        self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        while not self._closed.wait(self._flush_interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        for line in lines:
+            if self._file.tell() + len(line) > self._max_bytes and self._file.tell() > 0:
+                self._rotate()
+            self._file.write(line)
+        self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        if self._backup_count > 0:
+            for i in range(self._backup_count - 1, 0, -1):
+                if os.path.exists(f"{self._file_name}.{i}"):
+                    os.replace(f"{self._file_name}.{i}", f"{self._file_name}.{i + 1}")
+            os.replace(self._file_name, f"{self._file_name}.1")
+        self._file = open(self._file_name, "wb")
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+
+# import third-party modules
+
+# import your own module
+
+
+class TileOccupancy:
+    """
+    Index of the trains on each tile. Trains register the tiles of their trajectory as they enter and leave them, so
+    that checking if a tile is occupied does not require scanning trajectories.
+    A tile is occupied as long as it is in the track window of a train, not only while the body of the train covers
+    it: this includes the tile fetched ahead of the train and the one not dropped yet behind it. The straight padding
+    leaving the playing field overlaps the last tile by a point, and occupies that tile as well. The lock is therefore
+    slightly more conservative than checking the points covered by the trains, and never less.
+    """
+
+    def __init__(self):
+        self._trains_by_tile = dict()
+
+    def enter(self, tile, train):
+        try:
+            self._trains_by_tile[tile].add(train)
+        except KeyError:
+            self._trains_by_tile[tile] = {train}
+
+    def leave(self, tile, train):
+        trains = self._trains_by_tile.get(tile)
+        if trains is not None:
+            trains.discard(train)
+            if not trains:
+                del self._trains_by_tile[tile]
+
+    def trains_on(self, tile) -> frozenset:
+        return frozenset(self._trains_by_tile.get(tile, ()))
+
+    def is_occupied(self, tile) -> bool:
+        return tile in self._trains_by_tile
+
+    @property
+    def occupied_tiles(self) -> list:
+        return list(self._trains_by_tile.keys())
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+
+# import third-party modules
+import numpy as np
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.resources import Resources
+from trackswitchinggame.simulation import Simulation
+from trackswitchinggame.tracktile import TrackTile
+
+
+class TrackSwitchingEnv:
+    """
+    Headless game as a reinforcement learning environment, with the reset()/step() API of Gym environments.
+    Action: 0 does nothing, i switches the i-th tile of switch_tiles (if no train is on it).
+    Observation: dict of arrays. "tracks" is the tile grid, with the index in TRACKS of the active path of each tile.
+    "trains" has one row of TRAIN_FEATURES per train, in spawn order, padded with zeros up to max_trains.
+    Reward: points scored during the step, following the score of the game.
+    Episodes are never terminated (the game has no game over), only truncated after max_steps actions.
+    Episodes reset without seed are seeded from the previous one plus seed_stride, so that environments seeded with
+    consecutive seeds never play the same episodes when seed_stride is their number.
+    """
+
+    TRACKS = [None] + Resources.TILE_PATHS  # None for empty cells
+    TRAIN_FEATURES = ["present", "x", "y", "direction", "moving", "entry_portal", "platform", "exit_portal",
+                      "platform_status", "exit_portal_status"]
+    STATUS_CODES = {PENDING: 0, SUCCEEDED: 1, FAILED: -1}
+
+    def __init__(self, level_file: str, max_steps: int = None, steps_per_action: int = 1, max_trains: int = 16,
+                 seed_stride: int = 1):
+        self._level_file = level_file
+        self._max_steps = max_steps  # In actions
+        self._steps_per_action = steps_per_action  # Simulation steps per action
+        self._max_trains = max_trains
+        self._seed_stride = seed_stride
+        self.simulation = None
+        self._nb_actions_taken = 0
+        self._tracks = None
+        self._switch_tiles = []
+        self._portal_ids = dict()  # Goals are given as 1-based indices in the sorted portals and platforms
+        self._platform_ids = dict()
+
+    def reset(self, seed: int = None) -> tuple[dict, dict]:
+        """
+        Start a new episode, and return the first observation with an info dict. Without seed, the first episode is
+        random, and each next episode is seeded with the seed of the previous one plus seed_stride.
+        """
+        if seed is None and self.simulation is not None:
+            seed = self.simulation.seed + self._seed_stride
+        self.simulation = Simulation(self._level_file, seed=seed)
+        self._nb_actions_taken = 0
+
+        level_map = self.simulation.map
+        self._switch_tiles = sorted((tile for tile in level_map.tiles.sprites() if len(tile.paths) > 1),
+                                    key=lambda tile: (tile.rect.y, tile.rect.x))
+        self._portal_ids = {portal: i + 1 for i, portal in enumerate(sorted(level_map.portals))}
+        self._platform_ids = {platform: i + 1 for i, platform in enumerate(sorted(level_map.platforms))}
+        self._tracks = np.zeros((level_map.nb_rows, level_map.nb_cols), dtype=np.uint8)
+        for tile in level_map.tiles.sprites():
+            self._update_track(tile)
+        return self._observation(), self._info(switched=False)
+
+    def step(self, action: int) -> tuple[dict, float, bool, bool, dict]:
+        """
+        Apply an action, advance the simulation by steps_per_action steps, and return the observation, the reward,
+        whether the episode is terminated and truncated, and an info dict. Actions go from 0 to nb_actions - 1.
+        """
+        if not 0 <= action < self.nb_actions:
+            raise ValueError(f"Action {action} out of range [0, {self.nb_actions})")
+        switched = False
+        if action:
+            tile = self._switch_tiles[action - 1]
+            switched = self.simulation.switch_tile(tile)
+            if switched:
+                self._update_track(tile)
+
+        score = self.simulation.score
+        nb_collisions = self.simulation.nb_collisions
+        for _ in range(self._steps_per_action):
+            self.simulation.step()
+        self._nb_actions_taken += 1
+
+        reward = float(self.simulation.score - score)
+        truncated = self._max_steps is not None and self._nb_actions_taken >= self._max_steps
+        info = self._info(switched)
+        info["collisions"] = self.simulation.nb_collisions - nb_collisions
+        return self._observation(), reward, False, truncated, info
+
+    def _observation(self) -> dict:
+        trains = np.zeros((self._max_trains, len(self.TRAIN_FEATURES)), dtype=np.float32)
+        for i, train in enumerate(self.simulation.trains[:self._max_trains]):
+            trains[i] = (1, train.rect.centerx, train.rect.centery,
+                         1 if train.direction == FORWARD else -1 if train.direction == BACKWARD else 0,
+                         train.moving, self._portal_ids[train.entry_portal], self._platform_ids[train.platform],
+                         self._portal_ids[train.exit_portal], self.STATUS_CODES[train.platform_status],
+                         self.STATUS_CODES[train.exit_portal_status])
+        return {"tracks": self._tracks.copy(), "trains": trains}
+
+    def _info(self, switched: bool) -> dict:
+        return {"switched": switched,
+                "score": self.simulation.score,
+                "steps": self.simulation.steps,
+                "nb_trains": len(self.simulation.trains)}
+
+    def _update_track(self, tile: TrackTile):
+        self._tracks[tile.rect.y // TILE_LENGTH, tile.rect.x // TILE_LENGTH] = \
+            self.TRACKS.index(tile.get_trajectory().path)
+
+    @property
+    def switch_tiles(self) -> list[TrackTile]:
+        """
+        Tiles which can be switched, in row-major order. Available after reset().
+        """
+        return self._switch_tiles
+
+    @property
+    def nb_actions(self) -> int:
+        return len(self._switch_tiles) + 1
+
+    @property
+    def max_trains(self) -> int:
+        return self._max_trains
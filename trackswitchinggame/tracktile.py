@@ -8,6 +8,8 @@ from pygame.math import Vector2
 
 # import your own module
 from trackswitchinggame.constants import *
+from trackswitchinggame.resources import Resources
+from trackswitchinggame.trajectory import Trajectory
 
 
 class TrackTile(pg.sprite.Sprite):
@@ -32,8 +34,6 @@ class TrackTile(pg.sprite.Sprite):
 
         self._active_path = "main"
 
-        self._font = pg.font.SysFont("Verdana", 30)
-
         self._main_path_points = [(0, self._PATH_CHAR_TO_COORDS[self._main_path[0]]),
                                   (TILE_LENGTH / 2 - 1, TILE_LENGTH / 2 - 1),
                                   (TILE_LENGTH - 1, self._PATH_CHAR_TO_COORDS[self._main_path[1]])]
@@ -44,8 +44,11 @@ class TrackTile(pg.sprite.Sprite):
         else:
             self._alt_path_points = list()
 
-        self.image = pg.Surface((TILE_LENGTH, TILE_LENGTH))
-        self._update_image()
+        self._main_trajectory = Trajectory(self._main_path, self._position)
+        self._alt_trajectory = Trajectory(self._alt_path, self._position) if self._alt_path else None
+
+        self.rect = pg.Rect(self._position, (TILE_LENGTH, TILE_LENGTH))
+        self._image = None  # Rendered on first access, so that tiles can be used without a display
 
     def switch_track(self):
         # Switch track if tile has more than one track
@@ -54,33 +57,20 @@ class TrackTile(pg.sprite.Sprite):
                 self._active_path = "alt"
             elif self._active_path == "alt":
                 self._active_path = "main"
-            self._update_image()
+            if self._image is not None:
+                self._update_image()
 
-    def get_trajectory(self) -> list[Vector2]:
-        # Give list of points corresponding to the current track configuration
-        trajectory = list()
+    def get_trajectory(self) -> Trajectory:
+        # Give points corresponding to the current track configuration
+        if self._active_path == "alt":
+            return self._alt_trajectory
+        return self._main_trajectory
 
-        current_path = str()
-        if self._active_path == "main":
-            current_path = self._main_path
-        elif self._active_path == "alt":
-            current_path = self._alt_path
-
-        if current_path[0] == "u":
-            trajectory += [self._position + Vector2(i, i) for i in range(16)]
-        elif current_path[0] == "m":
-            trajectory += [self._position + Vector2(i, 15) for i in range(16)]
-        elif current_path[0] == "d":
-            trajectory += [self._position + Vector2(i, 31 - i) for i in range(16)]
-
-        if current_path[1] == "u":
-            trajectory += [self._position + Vector2(16 + i, 15 - i) for i in range(16)]
-        elif current_path[1] == "m":
-            trajectory += [self._position + Vector2(16 + i, 15) for i in range(16)]
-        elif current_path[1] == "d":
-            trajectory += [self._position + Vector2(16 + i, 16 + i) for i in range(16)]
-
-        return trajectory
+    def __getstate__(self) -> dict:
+        # Copies render their own image, when first drawn
+        state = self.__dict__.copy()
+        state["_image"] = None
+        return state
 
     def set_neighbour(self, compass_direction: str, tile: "TrackTile"):
         self._neighbours[compass_direction] = tile
@@ -88,34 +78,40 @@ class TrackTile(pg.sprite.Sprite):
     def get_neighbour(self, compass_direction: str) -> "TrackTile":
         return self._neighbours[compass_direction]
 
+    @staticmethod
+    def _label(name: str, color: pg.Color, x: int) -> pg.Surface:
+        # Text of a portal or platform name, shrunk to fit between x and the tile's edge if it is too wide
+        size = 30
+        text = Resources.text(name, "Verdana", size, color)
+        while text.get_width() > TILE_LENGTH - x and size > 1:
+            size = min(size - 1, size * (TILE_LENGTH - x) // text.get_width())
+            text = Resources.text(name, "Verdana", size, color)
+        return text
+
     def _update_image(self):
+        if self._image is None:
+            self._image = pg.Surface((TILE_LENGTH, TILE_LENGTH))
         # Portals and platforms have specific background text and colors
         if self._portal is not None:
             self.image.fill(pg.Color("lightblue"))
-            text = self._font.render(self._portal, True, pg.Color("darkblue"))
-            self.image.blit(text, (3, 1))
+            self.image.blit(self._label(self._portal, pg.Color("darkblue"), 3), (3, 1))
         elif self._platform is not None:
             self.image.fill(pg.Color("lightgreen"))
-            text = self._font.render(self._platform, True, pg.Color("darkgreen"))
-            self.image.blit(text, (6, 1))
+            self.image.blit(self._label(self._platform, pg.Color("darkgreen"), 6), (6, 1))
         else:
             self.image.fill(pg.Color("white"))
 
         # Draw inactive path in grey
-        tmp_tile = pg.surface.Surface((TILE_LENGTH, TILE_LENGTH), pg.SRCALPHA)
         if self._active_path == "alt":
-            tmp_tile = pg.image.load(f"assets/tiles/{self._main_path}.png").convert_alpha()
+            self.image.blit(Resources.tile_image(self._main_path, inactive=True), (0, 0))
         elif self._active_path == "main" and self._alt_path:
-            tmp_tile = pg.image.load(f"assets/tiles/{self._alt_path}.png").convert_alpha()
-        tmp_tile.set_alpha(128)
-        self.image.blit(tmp_tile, (0, 0))
+            self.image.blit(Resources.tile_image(self._alt_path, inactive=True), (0, 0))
 
         # Draw active path in black
         if self._active_path == "main":
-            tmp_tile = pg.image.load(f"assets/tiles/{self._main_path}.png").convert_alpha()
+            self.image.blit(Resources.tile_image(self._main_path), (0, 0))
         elif self._active_path == "alt" and self._alt_path:
-            tmp_tile = pg.image.load(f"assets/tiles/{self._alt_path}.png").convert_alpha()
-        self.image.blit(tmp_tile, (0, 0))
+            self.image.blit(Resources.tile_image(self._alt_path), (0, 0))
 
         if DEBUG:
             # Draw trajectory in red on top (debug)
@@ -125,9 +121,18 @@ class TrackTile(pg.sprite.Sprite):
             # Draw limits in red on top (debug)
             pg.draw.rect(self.image, pg.Color("lightcoral"), self.image.get_rect(), 1)
 
-        self.rect = self.image.get_rect()
-        self.rect.x = self._position[0]
-        self.rect.y = self._position[1]
+    @property
+    def image(self) -> pg.Surface:
+        if self._image is None:
+            self._update_image()
+        return self._image
+
+    @property
+    def paths(self) -> tuple[str, ...]:
+        """
+        Main path, followed by the alternative path if any.
+        """
+        return (self._main_path, self._alt_path) if self._alt_path else (self._main_path,)
 
     @property
     def portal(self) -> str:
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+from typing import Callable
+
+# import third-party modules
+import numpy as np
+from pygame.math import Vector2
+
+# import your own module
+from trackswitchinggame.constants import *
+
+
+class TrackWindow:
+    """
+    Window of consecutive track points, stored in a fixed-capacity ring buffer.
+    Points are addressed by absolute indices: adding points at the front or dropping points at either end does not
+    change the index of the other points, so pointers into the window stay valid. Valid indices go from start
+    (included) to end (excluded), and start may become negative when points are added at the front.
+    The buffer and the window state can be provided, for example as rows of the arrays of a TrainStates. In that case,
+    grow is called with the required capacity when the buffer is full, and is expected to re-bind the window.
+    """
+
+    DEFAULT_CAPACITY = 8 * TILE_LENGTH
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, points: np.ndarray = None, state: np.ndarray = None,
+                 grow: Callable[[int], None] = None):
+        if points is None:
+            points = np.zeros((capacity, 2), dtype=np.int32)
+        if state is None:
+            state = np.zeros(3, dtype=np.int64)
+        self._grow = grow
+        self.bind(points, state)
+
+    def bind(self, points: np.ndarray, state: np.ndarray):
+        self._points = points
+        self._state = state  # Position in _points of the point at index start, start and end
+
+    def append(self, points: np.ndarray):
+        """
+        Add points after the last point.
+        """
+        self._reserve(len(points))
+        positions = (self._head + (self._end - self._start) + np.arange(len(points))) % self.capacity
+        self._points[positions] = points
+        self._end += len(points)
+
+    def prepend(self, points: np.ndarray):
+        """
+        Add points before the first point. The last of these points ends up right before the current first point.
+        """
+        self._reserve(len(points))
+        self._head = (self._head - len(points)) % self.capacity
+        positions = (self._head + np.arange(len(points))) % self.capacity
+        self._points[positions] = points
+        self._start -= len(points)
+
+    def drop_first(self, n: int):
+        """
+        Forget the first n points.
+        """
+        n = min(n, len(self))
+        self._head = (self._head + n) % self.capacity
+        self._start += n
+
+    def drop_last(self, n: int):
+        """
+        Forget the last n points.
+        """
+        self._end -= min(n, len(self))
+
+    def points(self, start: int, stop: int) -> np.ndarray:
+        """
+        Array of the points with indices from start (included) to stop (excluded).
+        """
+        start = max(start, self._start)
+        stop = min(stop, self._end)
+        if stop <= start:
+            return np.zeros((0, 2), dtype=self._points.dtype)
+        return self._points[self._position(np.arange(start, stop))]
+
+    def _position(self, index):
+        return (self._head + (index - self._start)) % self.capacity
+
+    def _reserve(self, n: int):
+        # The buffer is only re-allocated if a train needs a longer window than anticipated
+        if len(self) + n > self.capacity:
+            new_capacity = max(2 * self.capacity, len(self) + n)
+            if self._grow is not None:
+                self._grow(new_capacity)
+            else:
+                points = np.zeros((new_capacity, 2), dtype=self._points.dtype)
+                points[:len(self)] = self.points(self._start, self._end)
+                self._points = points
+                self._head = 0
+
+    def __getitem__(self, index: int) -> Vector2:
+        if not self._start <= index < self._end:
+            raise IndexError(f"Track window index {index} out of range [{self._start}, {self._end})")
+        x, y = self._points[self._position(index)]
+        return Vector2(int(x), int(y))
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def _head(self) -> int:
+        return int(self._state[0])
+
+    @_head.setter
+    def _head(self, head: int):
+        self._state[0] = head
+
+    @property
+    def _start(self) -> int:
+        return int(self._state[1])
+
+    @_start.setter
+    def _start(self, start: int):
+        self._state[1] = start
+
+    @property
+    def _end(self) -> int:
+        return int(self._state[2])
+
+    @_end.setter
+    def _end(self, end: int):
+        self._state[2] = end
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def end(self) -> int:
+        return self._end
+
+    @property
+    def first(self) -> Vector2:
+        return self[self._start]
+
+    @property
+    def last(self) -> Vector2:
+        return self[self._end - 1]
+
+    @property
+    def capacity(self) -> int:
+        return len(self._points)
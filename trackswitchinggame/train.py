@@ -1,16 +1,22 @@
 # -*- coding: utf-8 -*-
 
 # import built-in module
+from collections import deque
 import math
+from typing import Callable
 
 # import third-party modules
+import numpy as np
 import pygame as pg
 from pygame import Vector2
 
 # import your own module
 from trackswitchinggame.wagonsprite import WagonSprite
 from trackswitchinggame.levelmap import LevelMap
+from trackswitchinggame.tracktile import TrackTile
+from trackswitchinggame.trainstates import TrainStates
 from trackswitchinggame.constants import *
+from trackswitchinggame.resources import Resources
 
 
 class Train:
@@ -19,7 +25,7 @@ class Train:
     A train spawns at a given entry_portal, will wait at a platform and despawn at an exit portal.
     Specific platform and exit_portal are provided as a goal to the player, but the train will wait at any platform,
     and despawn at any portal it crosses.
-    The train's movement follow points stored in trajectory.
+    The train's movement follow points stored in trajectory, a window of the track around the train.
     """
 
     WAIT_DELAY_VS_SPEED = {1: 5000,
@@ -28,17 +34,43 @@ class Train:
                            4: 2000,
                            5: 1000}
 
-    def __init__(self, levelmap: LevelMap, entry_portal: str, platform: str, exit_portal: str):
+    WAIT_INDICATOR_STEP = 1  # Wait indicators are cached for arc angles rounded to this step, in degrees
+
+    # Indicator images shared by all trains
+    _goal_indicators = dict()  # Keyed by (size, goal, color)
+    _wait_indicators = dict()  # Keyed by (size, quantized arc angle)
+
+    def __init__(self, levelmap: LevelMap, entry_portal: str, platform: str, exit_portal: str,
+                 clock: Callable[[], float] = pg.time.get_ticks, states: TrainStates = None):
         self._levelmap = levelmap
-        self.trajectory = list()
-        self.rightmost_position_pointer = None  # Initialized when calling spawn()
-        self.speed = 1
+        self._clock = clock  # Returns the current time in milliseconds
 
         # Set-up wagons
         self._wagons = pg.sprite.Group()
         self._wagons.add(WagonSprite("assets/trains/ice_loc.png"))
         self._wagons.add(WagonSprite("assets/trains/ice_wagon.png"))
         self._wagons.add(WagonSprite("assets/trains/ice_loc.png", True))
+        self._length = sum(wagon.length for wagon in self._wagons.sprites())
+
+        # Kinematic state (pointers, speed, direction, trajectory) is stored in a TrainStates, shared by other trains
+        self._states = states if states is not None else TrainStates(capacity=1)
+        self._slot = self._states.allocate([wagon.length for wagon in self._wagons.sprites()])
+        self.trajectory = self._states.track_window(self._slot)
+
+        # Indicators
+        self._GOAL_INDICATOR_SIZE = 10
+        self._WAIT_INDICATOR_SIZE = 14
+
+        self.reset(entry_portal, platform, exit_portal)
+
+    def reset(self, entry_portal: str, platform: str, exit_portal: str):
+        """
+        Bring the train back to its initial, not spawned state, with new goals. Allows re-using Train objects.
+        """
+        self._states.reset(self._slot)
+        for wagon in self._wagons.sprites():
+            wagon.reset()
+        self.speed = 1
 
         # Goals
         self._entry_portal = entry_portal
@@ -49,118 +81,150 @@ class Train:
 
         # State variables
         self._spawned = False
-        self._moving = False
         self._waiting = False
-        self.direction = None
         self._wait_end = 0
         self._wait_total = 0
 
-        # Indicators
-        self._GOAL_INDICATOR_SIZE = 10
-        self._WAIT_INDICATOR_SIZE = 14
-        self._font = pg.font.SysFont("Verdana", self._GOAL_INDICATOR_SIZE)
+        # Tile of each TILE_LENGTH segment of the trajectory. Padding outside of the playing field is counted on the
+        # tile it overlaps where it joins the track, if any, and is None otherwise.
+        self._trajectory_tiles = deque()
 
         # Prepare trajectory for the spawn
         portal_tile = self._levelmap.portals[self._entry_portal].sprites()[0]
         spawn_tile_traj = portal_tile.get_trajectory()
         nb_padding_tiles = math.ceil(self.length / TILE_LENGTH)
+        padding = np.arange(nb_padding_tiles * TILE_LENGTH)
         if (portal_tile.get_neighbour(NW) is None) and \
                 (portal_tile.get_neighbour(W) is None) and \
                 (portal_tile.get_neighbour(SW) is None):
-            for i in range(nb_padding_tiles * TILE_LENGTH):
-                self.trajectory.append(Vector2(-(nb_padding_tiles * TILE_LENGTH) + i, spawn_tile_traj[0].y))
-            self.trajectory += spawn_tile_traj
+            self.trajectory.append(np.column_stack((-(nb_padding_tiles * TILE_LENGTH) + padding,
+                                                    np.full(len(padding), spawn_tile_traj[0].y))))
+            self._trajectory_tiles.extend([None] * nb_padding_tiles)
+            self._extend_trajectory(spawn_tile_traj.points, portal_tile)
             self.direction = FORWARD
-            self.rightmost_position_pointer = len(self.trajectory) - 1
+            self.rightmost_position_pointer = self.trajectory.end - 1
         elif (portal_tile.get_neighbour(NE) is None) and \
                 (portal_tile.get_neighbour(E) is None) and \
                 (portal_tile.get_neighbour(SE) is None):
-            self.trajectory += spawn_tile_traj
-            for i in range(nb_padding_tiles * TILE_LENGTH):
-                self.trajectory.append(Vector2(spawn_tile_traj[-1].x + i, spawn_tile_traj[0].y))
+            self._extend_trajectory(spawn_tile_traj.points, portal_tile)
+            self.trajectory.append(np.column_stack((spawn_tile_traj[-1].x + padding,
+                                                    np.full(len(padding), spawn_tile_traj[0].y))))
+            self._trajectory_tiles.extend([None] * nb_padding_tiles)
             self.direction = BACKWARD
-            self.leftmost_position_pointer = 0
+            self.leftmost_position_pointer = self.trajectory.start
 
     def update(self):
         """
-        Update position of the train
+        Update position of the train, as TrainStates.update([self]) would, without the NumPy overhead of a batch of
+        one train.
+        """
+        if self.prepare_move():
+            new_pointer = self.rightmost_position_pointer + self.trajectory_pointer_increment
+            # Without trajectory defined for the new position, the train does not move.
+            if new_pointer < self.trajectory.end and new_pointer - self.length + 1 >= self.trajectory.start:
+                self.rightmost_position_pointer = new_pointer
+                self._place_wagons()
+        self.finish_move()
+
+    def prepare_move(self) -> bool:
         """
+        First part of update(): check goals and extend the trajectory if needed. Returns True if the train moves.
+        """
+        for wagon in self._wagons.sprites():
+            wagon.previous_rect = wagon.rect.copy()
+
         if self._platform_status == PENDING:
             self._check_for_platform()
         elif self._exit_portal_status == PENDING:
             self._check_for_exit_portal()
 
         if self.moving:
-            # Update position
             self._update_trajectory()
-            self.rightmost_position_pointer += self.trajectory_pointer_increment
-            if self.rightmost_position_pointer >= len(self.trajectory) or self.leftmost_position_pointer < 0:
-                # No trajectory defined, we do not move.
-                self.rightmost_position_pointer -= self.trajectory_pointer_increment
-            else:
-                current_offset = self.rightmost_position_pointer
-
-                for wagon in self._wagons.sprites():
-                    # Should the position of the axles be handled individually by each wagon?
-                    # Do we want wagons to have a variable axle offset??
-                    axle_1_pointer = current_offset - 5
-                    axle_2_pointer = current_offset - 24
-                    position_axle_1 = self.trajectory[axle_1_pointer]
-                    position_axle_2 = self.trajectory[axle_2_pointer]
-                    wagon.update(position_axle_1, position_axle_2)
-                    current_offset -= wagon.length
-                    wagon.rect.x = self.trajectory[current_offset + 1].x
+        return self.moving
 
+    def finish_move(self):
+        """
+        Last part of update(), once the train has moved.
+        """
         if self.waiting:
-            if pg.time.get_ticks() > self._wait_end:
+            if self._clock() > self._wait_end:
                 self._waiting = False
                 self.start(self.direction)
 
-    def draw(self, screen: pg.surface.Surface):
+    def draw(self, screen: pg.surface.Surface, alpha: float = 1) -> list[pg.Rect]:
         """
-        Draw the train.
+        Draw the train, at alpha between its previous and current position. Returns the list of screen areas that were
+        drawn on.
         """
+        drawn_rects = list()
         if self.spawned:
             # Draw wagons
-            self._wagons.draw(screen)
+            wagon_rects = [wagon.interpolated_rect(alpha) for wagon in self._wagons.sprites()]
+            for wagon, wagon_rect in zip(self._wagons.sprites(), wagon_rects):
+                screen.blit(wagon.image, wagon_rect)
+            drawn_rects += [wagon_rect.copy() for wagon_rect in wagon_rects]
 
             # Draw current goal on first front-facing wagon
-            goal_indicator = pg.surface.Surface((self._GOAL_INDICATOR_SIZE, self._GOAL_INDICATOR_SIZE))
-
             if self._platform_status == PENDING:
-                goal_indicator.fill(pg.Color("lightgreen"))
-                goal_indicator.blit(self._font.render(self._platform, True, pg.Color("black")),
-                                    (3, 1))
+                goal_indicator = self._goal_indicator(self._platform, "lightgreen")
             elif self._exit_portal_status == PENDING:
-                goal_indicator.fill(pg.Color("lightblue"))
-                goal_indicator.blit(self._font.render(self._exit_portal, True, pg.Color("black")),
-                                    (3, 1))
+                goal_indicator = self._goal_indicator(self._exit_portal, "lightblue")
             else:
-                goal_indicator.set_alpha(0)
+                goal_indicator = None
 
-            goal_indicator_rect = goal_indicator.get_rect()
-            if self.direction == FORWARD:
-                first_wagon = self._wagons.sprites()[0]
-            elif self.direction == BACKWARD:
-                first_wagon = self._wagons.sprites()[-1]
-            goal_indicator_rect.center = first_wagon.rect.center
+            if goal_indicator is not None:
+                goal_indicator_rect = goal_indicator.get_rect()
+                if self.direction == FORWARD:
+                    first_wagon_rect = wagon_rects[0]
+                elif self.direction == BACKWARD:
+                    first_wagon_rect = wagon_rects[-1]
+                goal_indicator_rect.center = first_wagon_rect.center
 
-            screen.blit(goal_indicator, goal_indicator_rect)
+                screen.blit(goal_indicator, goal_indicator_rect)
+                drawn_rects.append(goal_indicator_rect)
 
             if self.waiting:
                 # Draw wait indicator in front of train
-                wait_indicator = pg.Surface((self._WAIT_INDICATOR_SIZE, self._WAIT_INDICATOR_SIZE))
-                wait_indicator.fill(pg.Color("white"))
-                wait_indicator.set_colorkey(pg.Color("white"))
-                pg.draw.arc(wait_indicator, pg.Color("darkorange"), wait_indicator.get_rect(),
-                            0, (self._wait_end - pg.time.get_ticks()) / self._wait_total * 2 * math.pi,
-                            2)
+                wait_indicator = self._wait_indicator((self._wait_end - self._clock()) / self._wait_total * 360)
                 wait_indicator_rect = wait_indicator.get_rect()
                 if self.direction == FORWARD:
-                    wait_indicator_rect.center = self._wagons.sprites()[0].rect.center + Vector2(TILE_LENGTH, 0)
+                    wait_indicator_rect.center = wagon_rects[0].center + Vector2(TILE_LENGTH, 0)
                 elif self.direction == BACKWARD:
-                    wait_indicator_rect.center = self._wagons.sprites()[-1].rect.center - Vector2(TILE_LENGTH, 0)
+                    wait_indicator_rect.center = wagon_rects[-1].center - Vector2(TILE_LENGTH, 0)
                 screen.blit(wait_indicator, wait_indicator_rect)
+                drawn_rects.append(wait_indicator_rect)
+        return drawn_rects
+
+    def _goal_indicator(self, goal: str, color: str) -> pg.Surface:
+        key = (self._GOAL_INDICATOR_SIZE, goal, color)
+        try:
+            return self._goal_indicators[key]
+        except KeyError:
+            text = Resources.text(goal, "Verdana", self._GOAL_INDICATOR_SIZE, pg.Color("black"))
+            # Widened for names that do not fit, with the same margin on both sides
+            width = self._GOAL_INDICATOR_SIZE
+            if text.get_width() + 3 > width:
+                width = text.get_width() + 2 * 3
+            goal_indicator = pg.Surface((width, self._GOAL_INDICATOR_SIZE))
+            goal_indicator.fill(pg.Color(color))
+            goal_indicator.blit(text, (3, 1))
+            self._goal_indicators[key] = goal_indicator
+            return goal_indicator
+
+    def _wait_indicator(self, angle: float) -> pg.Surface:
+        # Arc of angle degrees, for the remaining waiting time
+        quantized_angle = round(angle / self.WAIT_INDICATOR_STEP) * self.WAIT_INDICATOR_STEP
+        key = (self._WAIT_INDICATOR_SIZE, quantized_angle)
+        try:
+            return self._wait_indicators[key]
+        except KeyError:
+            wait_indicator = pg.Surface((self._WAIT_INDICATOR_SIZE, self._WAIT_INDICATOR_SIZE))
+            wait_indicator.fill(pg.Color("white"))
+            wait_indicator.set_colorkey(pg.Color("white"))
+            pg.draw.arc(wait_indicator, pg.Color("darkorange"), wait_indicator.get_rect(),
+                        0, math.radians(quantized_angle), 2)
+            self._wait_indicators[key] = wait_indicator
+            return wait_indicator
 
     def start(self, direction: str):
         """
@@ -168,33 +232,27 @@ class Train:
         """
         if not self.waiting:
             self.direction = direction
-            self._moving = True
+            self._states.moving[self._slot] = True
 
     def stop(self):
         """
         Train stops.
         """
-        self._moving = False
+        self._states.moving[self._slot] = False
 
     def spawn(self):
         """
         Spawn train.
         """
         self._spawned = True
+        for tile in self._trajectory_tiles:
+            if tile is not None:
+                self._levelmap.occupancy.enter(tile, self)
         self.start(self.direction)
         self.wait(self.WAIT_DELAY_VS_SPEED[self.speed])
 
         # This update allows the train to appear at the right position, even though it is currently waiting.
-        current_offset = self.rightmost_position_pointer
-        for wagon in self._wagons.sprites():
-            # Should the position of the axles be handled individually by each wagon?
-            # Do we want wagons to have a variable axle offset??
-            axle_1_pointer = current_offset - 5
-            axle_2_pointer = current_offset - 24
-            position_axle_1 = self.trajectory[axle_1_pointer]
-            position_axle_2 = self.trajectory[axle_2_pointer]
-            wagon.update(position_axle_1, position_axle_2)
-            current_offset -= wagon.length
+        self._states.place_wagons([self])
 
     def despawn(self):
         """
@@ -202,108 +260,147 @@ class Train:
         """
         self._spawned = False
         self.stop()
+        for tile in self._trajectory_tiles:
+            if tile is not None:
+                self._levelmap.occupancy.leave(tile, self)
 
     def wait(self, milliseconds: int):
         """
         Wait for number of milliseconds.
         """
-        self._wait_end = pg.time.get_ticks() + milliseconds
+        self._wait_end = self._clock() + milliseconds
         self._wait_total = milliseconds
         self.stop()
         self._waiting = True
 
+    def _place_wagons(self):
+        # Same placement as TrainStates.place_wagons(align_left=True), one wagon at a time
+        wagon_pointer = self.rightmost_position_pointer
+        for wagon in self._wagons.sprites():
+            wagon.update(self.trajectory[wagon_pointer - TrainStates.AXLE_1_OFFSET],
+                         self.trajectory[wagon_pointer - TrainStates.AXLE_2_OFFSET])
+            wagon.rect.x = int(self.trajectory[wagon_pointer - wagon.length + 1].x)
+            wagon_pointer -= wagon.length
+
     def colliderect(self, rect: pg.Rect) -> bool:
         """
         Checks if the train collides a Rect.
         """
-        for point in self.trajectory[self.leftmost_position_pointer:self.rightmost_position_pointer]:
-            if rect.collidepoint(point.x, point.y):
-                return True
-        return False
+        points = self.trajectory.points(self.leftmost_position_pointer, self.rightmost_position_pointer)
+        return bool(np.any((points[:, 0] >= rect.left) & (points[:, 0] < rect.right) &
+                           (points[:, 1] >= rect.top) & (points[:, 1] < rect.bottom)))
 
     def _check_for_platform(self):
-        for platform, group in self._levelmap.platforms.items():
-            rect = None
-            for sprite in group:
-                if not rect:
-                    rect = sprite.rect
-                else:
-                    rect = rect.union(sprite.rect)
-            if rect.contains(self.rect):
-                self.wait(self.WAIT_DELAY_VS_SPEED[self.speed])
-
-                # Change direction based on exit goal
-                train_position = self.trajectory[self.leftmost_position_pointer]
-                exit_portal_position = Vector2(self._levelmap.portals[self._exit_portal].sprites()[0].rect.center)
-                if train_position.x - exit_portal_position.x > 0:
-                    self.direction = BACKWARD
-                else:
-                    self.direction = FORWARD
+        platform = self._levelmap.platform_containing(self.rect)
+        if platform is not None:
+            self.wait(self.WAIT_DELAY_VS_SPEED[self.speed])
+
+            # Change direction based on exit goal
+            train_position = self.trajectory[self.leftmost_position_pointer]
+            exit_portal_position = Vector2(self._levelmap.portal_rect(self._exit_portal).center)
+            if train_position.x - exit_portal_position.x > 0:
+                self.direction = BACKWARD
+            else:
+                self.direction = FORWARD
 
-                # Check if platform goal was successful or not
-                if self._platform == platform:
-                    self._platform_status = SUCCEEDED
-                else:
-                    self._platform_status = FAILED
-                break
+            # Check if platform goal was successful or not
+            if self._platform == platform:
+                self._platform_status = SUCCEEDED
+            else:
+                self._platform_status = FAILED
 
     def _check_for_exit_portal(self):
-        for portal, group in self._levelmap.portals.items():
-            tile = group.sprites()[0]
-            if self.rect.colliderect(tile.rect):
-                if tile.portal == self._exit_portal:
-                    self._exit_portal_status = SUCCEEDED
-                else:
-                    self._exit_portal_status = FAILED
-                break
+        portal = self._levelmap.portal_colliding(self.rect)
+        if portal is not None:
+            if portal == self._exit_portal:
+                self._exit_portal_status = SUCCEEDED
+            else:
+                self._exit_portal_status = FAILED
 
     def _update_trajectory(self):
+        # Pointers are absolute indices in the track window, so they are not affected by adding or dropping points.
         if self.direction == FORWARD:
-            if (self.rightmost_position_pointer + self.trajectory_pointer_increment) >= len(self.trajectory):
+            if (self.rightmost_position_pointer + self.trajectory_pointer_increment) >= self.trajectory.end:
                 # We need to fetch trajectory information from next tile
-                train_vector = self.trajectory[-1] - self.trajectory[-2]
-                next_tile_position = self.trajectory[-1] + train_vector
+                train_vector = self.trajectory.last - self.trajectory[self.trajectory.end - 2]
+                next_tile_position = self.trajectory.last + train_vector
                 next_tile = self._levelmap.tile_at(next_tile_position)
                 if next_tile:
                     new_trajectory = next_tile.get_trajectory()
                     # Check if our entry point is valid for the next tile
                     if next_tile_position in new_trajectory:
-                        self.trajectory += new_trajectory
+                        self._extend_trajectory(new_trajectory.points, next_tile)
                 else:
                     # No next tile, which means we are headed out of playing field.
                     # Padding with a straight trajectory for now.
-                    last_point = self.trajectory[-1]
-                    self.trajectory += [last_point + Vector2(i, 0) for i in range(TILE_LENGTH)]
+                    last_point = self.trajectory.last
+                    self._extend_trajectory(self._straight_points(last_point.x, last_point.y))
 
-            if (self.leftmost_position_pointer + self.trajectory_pointer_increment) >= TILE_LENGTH:
+            if (self.leftmost_position_pointer + self.trajectory_pointer_increment -
+                    self.trajectory.start) >= TILE_LENGTH:
                 # We can delete trajectory information from last tile
-                self.trajectory = self.trajectory[TILE_LENGTH:]
-                self.rightmost_position_pointer -= TILE_LENGTH
+                self._shrink_trajectory(at_front=True)
 
         elif self.direction == BACKWARD:
-            if (self.leftmost_position_pointer + self.trajectory_pointer_increment) < 0:
+            if (self.leftmost_position_pointer + self.trajectory_pointer_increment) < self.trajectory.start:
                 # We need to fetch trajectory information from previous tile
-                train_vector = self.trajectory[0] - self.trajectory[1]
-                next_tile_position = self.trajectory[0] + train_vector
+                train_vector = self.trajectory.first - self.trajectory[self.trajectory.start + 1]
+                next_tile_position = self.trajectory.first + train_vector
                 next_tile = self._levelmap.tile_at(next_tile_position)
                 if next_tile:
                     new_trajectory = next_tile.get_trajectory()
                     # Check if our entry point is valid for the next tile
                     if next_tile_position in new_trajectory:
-                        self.trajectory = new_trajectory + self.trajectory
-                        self.rightmost_position_pointer += TILE_LENGTH
+                        self._extend_trajectory(new_trajectory.points, next_tile, at_front=True)
                 else:
                     # No next tile, which means we are headed out of playing field.
                     # Padding with a straight trajectory for now.
-                    last_point = self.trajectory[0]
-                    self.trajectory = [last_point + Vector2(-TILE_LENGTH + i, 0) for i in
-                                       range(TILE_LENGTH)] + self.trajectory
-                    self.rightmost_position_pointer += TILE_LENGTH
+                    last_point = self.trajectory.first
+                    self._extend_trajectory(self._straight_points(last_point.x - TILE_LENGTH, last_point.y),
+                                            at_front=True)
 
             if (self.rightmost_position_pointer + self.trajectory_pointer_increment) < (
-                    len(self.trajectory) - TILE_LENGTH):
+                    self.trajectory.end - TILE_LENGTH):
                 # We can delete trajectory information from last tile
-                self.trajectory = self.trajectory[:-TILE_LENGTH]
+                self._shrink_trajectory(at_front=False)
+
+    def _extend_trajectory(self, points: np.ndarray, tile: TrackTile = None, at_front: bool = False):
+        # Add the TILE_LENGTH points of a tile (or of padding if tile is None) to the trajectory, and enter the tile
+        if tile is None:
+            x, y = points[-1] if at_front else points[0]
+            tile = self._levelmap.tile_at(Vector2(int(x), int(y)))
+        if at_front:
+            self.trajectory.prepend(points)
+            self._trajectory_tiles.appendleft(tile)
+        else:
+            self.trajectory.append(points)
+            self._trajectory_tiles.append(tile)
+        if tile is not None and self._spawned:
+            self._levelmap.occupancy.enter(tile, self)
+
+    def _shrink_trajectory(self, at_front: bool):
+        # Remove the TILE_LENGTH points of the first or last tile of the trajectory, and leave the tile
+        if at_front:
+            self.trajectory.drop_first(TILE_LENGTH)
+            tile = self._trajectory_tiles.popleft()
+        else:
+            self.trajectory.drop_last(TILE_LENGTH)
+            tile = self._trajectory_tiles.pop()
+        if tile is not None and tile not in self._trajectory_tiles:
+            self._levelmap.occupancy.leave(tile, self)
+
+    @staticmethod
+    def _straight_points(x: float, y: float) -> np.ndarray:
+        # Horizontal line of TILE_LENGTH points, starting at (x, y)
+        return np.column_stack((x + np.arange(TILE_LENGTH), np.full(TILE_LENGTH, y)))
+
+    @property
+    def rightmost_position_pointer(self) -> int:
+        return int(self._states.pointers[self._slot])
+
+    @rightmost_position_pointer.setter
+    def rightmost_position_pointer(self, p: int):
+        self._states.pointers[self._slot] = p
 
     @property
     def leftmost_position_pointer(self):
@@ -325,10 +422,7 @@ class Train:
 
     @property
     def length(self):
-        length = 0
-        for wagon in self._wagons:
-            length += wagon.length
-        return length
+        return self._length
 
     @property
     def rect(self):
@@ -338,13 +432,33 @@ class Train:
         else:
             return None
 
+    @property
+    def speed(self) -> int:
+        return int(self._states.speeds[self._slot])
+
+    @speed.setter
+    def speed(self, speed: int):
+        self._states.speeds[self._slot] = speed
+
+    @property
+    def direction(self) -> str:
+        return TrainStates.SIGN_TO_DIRECTION[int(self._states.directions[self._slot])]
+
+    @direction.setter
+    def direction(self, direction: str):
+        self._states.directions[self._slot] = TrainStates.DIRECTION_TO_SIGN[direction]
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
     @property
     def spawned(self) -> bool:
         return self._spawned
 
     @property
     def moving(self) -> bool:
-        return self._moving
+        return bool(self._states.moving[self._slot])
 
     @property
     def waiting(self) -> bool:
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+from typing import Callable
+
+# import third-party modules
+
+# import your own module
+from trackswitchinggame.levelmap import LevelMap
+from trackswitchinggame.train import Train
+from trackswitchinggame.trainstates import TrainStates
+
+
+class TrainPool:
+    """
+    Pool of Train objects, so that spawning a train re-uses a despawned one (with its wagons and TrainStates slot)
+    instead of building a new one. Memory stays flat over long sessions.
+    """
+
+    def __init__(self, levelmap: LevelMap, clock: Callable[[], float], states: TrainStates):
+        self._levelmap = levelmap
+        self._clock = clock
+        self._states = states
+        self._free_trains = []
+
+    def acquire(self, entry_portal: str, platform: str, exit_portal: str) -> Train:
+        """
+        Get a train, not spawned yet, with the given goals.
+        """
+        if self._free_trains:
+            train = self._free_trains.pop()
+            train.reset(entry_portal, platform, exit_portal)
+            return train
+        return Train(self._levelmap, entry_portal, platform, exit_portal, self._clock, self._states)
+
+    def release(self, train: Train):
+        """
+        Give back a despawned train, to be re-used by acquire().
+        """
+        self._free_trains.append(train)
+
+    def __len__(self) -> int:
+        return len(self._free_trains)
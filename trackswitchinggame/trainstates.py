@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+
+# import third-party modules
+import numpy as np
+
+# import your own module
+from trackswitchinggame.constants import *
+from trackswitchinggame.trackwindow import TrackWindow
+
+
+class TrainStates:
+    """
+    Kinematic state of a set of trains, stored as a structure of arrays with one row (slot) per train: pointers, speed,
+    direction, movement, wagon layout and track window. update() advances all trains and places all their wagons with
+    a few NumPy operations, instead of one Python update per train and per wagon.
+    Slots are never freed: despawned trains keep theirs, and are re-used by the TrainPool.
+    """
+
+    NB_WAGONS = 3
+    AXLE_1_OFFSET = 5  # Distance between the rightmost point of a wagon and its axles, in trajectory points
+    AXLE_2_OFFSET = 24
+    DIRECTION_TO_SIGN = {FORWARD: 1, BACKWARD: -1, None: 0}
+    SIGN_TO_DIRECTION = {1: FORWARD, -1: BACKWARD, 0: None}
+
+    def __init__(self, capacity: int = 16, window_capacity: int = TrackWindow.DEFAULT_CAPACITY):
+        self._windows = [None] * capacity  # TrackWindow of each slot, None for slots not allocated yet
+        self.points = np.zeros((capacity, window_capacity, 2), dtype=np.int32)
+        self.window_states = np.zeros((capacity, 3), dtype=np.int64)  # head, start and end of each track window
+        self.pointers = np.zeros(capacity, dtype=np.int64)  # rightmost position pointer of each train
+        self.speeds = np.ones(capacity, dtype=np.int64)
+        self.directions = np.zeros(capacity, dtype=np.int64)  # 1 for FORWARD, -1 for BACKWARD
+        self.moving = np.zeros(capacity, dtype=bool)
+        self.wagon_lengths = np.zeros((capacity, self.NB_WAGONS), dtype=np.int64)
+        self.wagon_offsets = np.zeros((capacity, self.NB_WAGONS), dtype=np.int64)  # from train to wagon rightmost point
+
+    def allocate(self, wagon_lengths: list[int]) -> int:
+        """
+        Reserve a slot for a new train made of wagons of given lengths, and return it.
+        """
+        try:
+            slot = self._windows.index(None)
+        except ValueError:
+            slot = len(self._windows)
+            self._grow_slots(2 * len(self._windows))
+
+        self.wagon_lengths[slot] = wagon_lengths
+        self.wagon_offsets[slot] = np.concatenate(([0], np.cumsum(wagon_lengths)[:-1]))
+        self._windows[slot] = TrackWindow(points=self.points[slot], state=self.window_states[slot],
+                                          grow=self._grow_windows)
+        self.reset(slot)
+        return slot
+
+    def reset(self, slot: int):
+        """
+        Bring a slot back to a stopped train with an empty track window.
+        """
+        self.window_states[slot] = 0
+        self.pointers[slot] = 0
+        self.speeds[slot] = 1
+        self.directions[slot] = 0
+        self.moving[slot] = False
+
+    def track_window(self, slot: int) -> TrackWindow:
+        return self._windows[slot]
+
+    def update(self, trains: list):
+        """
+        Update all given trains, which must all use this TrainStates.
+        """
+        moving_trains = [train for train in trains if train.prepare_move()]
+        if moving_trains:
+            slots = np.array([train.slot for train in moving_trains])
+            lengths = self.wagon_lengths[slots].sum(axis=1)
+            windows = self.window_states[slots]
+            new_pointers = self.pointers[slots] + self.speeds[slots] * self.directions[slots]
+            # Without trajectory defined for the new position, the train does not move.
+            valid = (new_pointers < windows[:, 2]) & (new_pointers - lengths + 1 >= windows[:, 1])
+            self.pointers[slots[valid]] = new_pointers[valid]
+            self.place_wagons([train for train, is_valid in zip(moving_trains, valid) if is_valid], align_left=True)
+
+        for train in trains:
+            train.finish_move()
+
+    def place_wagons(self, trains: list, align_left: bool = False):
+        """
+        Place the wagons of the given trains on their trajectory, based on the trains' pointers. If align_left, the
+        rect of each wagon is then aligned horizontally with its leftmost trajectory point.
+        """
+        if not trains:
+            return
+        slots = np.array([train.slot for train in trains])
+        wagon_pointers = self.pointers[slots][:, np.newaxis] - self.wagon_offsets[slots]
+        position_axle_1 = self._points_at(slots, wagon_pointers - self.AXLE_1_OFFSET)
+        position_axle_2 = self._points_at(slots, wagon_pointers - self.AXLE_2_OFFSET)
+        diff = position_axle_1 - position_axle_2
+        angles = np.degrees(np.arctan(diff[..., 1] / diff[..., 0]))
+        centers = (position_axle_1 + position_axle_2) / 2
+        if align_left:
+            lefts = self._points_at(slots, wagon_pointers - self.wagon_lengths[slots] + 1)[..., 0]
+
+        for i, train in enumerate(trains):
+            for j, wagon in enumerate(train.wagons.sprites()):
+                wagon.place(float(angles[i, j]), float(centers[i, j, 0]), float(centers[i, j, 1]))
+                if align_left:
+                    wagon.rect.x = int(lefts[i, j])
+
+    def __setstate__(self, state: dict):
+        # Copied track windows must use the rows of the copied arrays
+        self.__dict__.update(state)
+        self._rebind_windows()
+
+    def _points_at(self, slots: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        # Trajectory points at given absolute indices, for each slot (one row of indices per slot)
+        heads = self.window_states[slots, 0][:, np.newaxis]
+        starts = self.window_states[slots, 1][:, np.newaxis]
+        positions = (heads + indices - starts) % self.points.shape[1]
+        return self.points[slots[:, np.newaxis], positions]
+
+    def _grow_slots(self, capacity: int):
+        extra = capacity - len(self._windows)
+        self._windows += [None] * extra
+        self.points = np.concatenate((self.points, np.zeros((extra,) + self.points.shape[1:], dtype=np.int32)))
+        self.window_states = np.concatenate((self.window_states, np.zeros((extra, 3), dtype=np.int64)))
+        self.pointers = np.concatenate((self.pointers, np.zeros(extra, dtype=np.int64)))
+        self.speeds = np.concatenate((self.speeds, np.ones(extra, dtype=np.int64)))
+        self.directions = np.concatenate((self.directions, np.zeros(extra, dtype=np.int64)))
+        self.moving = np.concatenate((self.moving, np.zeros(extra, dtype=bool)))
+        self.wagon_lengths = np.concatenate((self.wagon_lengths, np.zeros((extra, self.NB_WAGONS), dtype=np.int64)))
+        self.wagon_offsets = np.concatenate((self.wagon_offsets, np.zeros((extra, self.NB_WAGONS), dtype=np.int64)))
+        self._rebind_windows()
+
+    def _grow_windows(self, window_capacity: int):
+        # Track windows are linearized in the new buffer
+        points = np.zeros((len(self._windows), window_capacity, 2), dtype=np.int32)
+        for slot, window in enumerate(self._windows):
+            if window is not None:
+                points[slot, :len(window)] = window.points(window.start, window.end)
+                self.window_states[slot, 0] = 0
+        self.points = points
+        self._rebind_windows()
+
+    def _rebind_windows(self):
+        for slot, window in enumerate(self._windows):
+            if window is not None:
+                window.bind(self.points[slot], self.window_states[slot])
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+
+# import third-party modules
+import numpy as np
+from pygame.math import Vector2
+
+# import your own module
+from trackswitchinggame.constants import *
+
+
+class Trajectory:
+    """
+    Immutable sequence of points followed by trains across a tile, for one path (e.g. "mm", "md").
+    The points of a path are computed once, relative to the tile's top-left corner, and shared by all tiles. They are
+    only translated to the tile position when accessed.
+    """
+
+    _local_points = dict()  # Shared (TILE_LENGTH, 2) arrays, keyed by path
+    _local_point_sets = dict()  # Shared sets of (x, y) tuples, keyed by path, for membership tests
+
+    def __init__(self, path: str, origin: Vector2):
+        self._path = path
+        self._origin = np.array((origin.x, origin.y), dtype=np.int32)
+        self._origin_x, self._origin_y = int(origin.x), int(origin.y)
+        self._local = self.local_points(path)
+        self._local_set = self._local_point_sets[path]
+
+    @classmethod
+    def local_points(cls, path: str) -> np.ndarray:
+        """
+        Read-only array of the points of a path, relative to the tile's top-left corner.
+        """
+        try:
+            return cls._local_points[path]
+        except KeyError:
+            half = TILE_LENGTH // 2
+            i = np.arange(half)
+            if path[0] == "u":
+                first_half = np.column_stack((i, i))
+            elif path[0] == "m":
+                first_half = np.column_stack((i, np.full(half, half - 1)))
+            else:
+                first_half = np.column_stack((i, TILE_LENGTH - 1 - i))
+
+            if path[1] == "u":
+                second_half = np.column_stack((half + i, half - 1 - i))
+            elif path[1] == "m":
+                second_half = np.column_stack((half + i, np.full(half, half - 1)))
+            else:
+                second_half = np.column_stack((half + i, half + i))
+
+            points = np.concatenate((first_half, second_half)).astype(np.int16)
+            points.flags.writeable = False
+            cls._local_points[path] = points
+            cls._local_point_sets[path] = frozenset(map(tuple, points.tolist()))
+            return points
+
+    def __deepcopy__(self, memo: dict) -> "Trajectory":
+        # Trajectories are immutable, and can be shared by copies of their tile
+        return self
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def points(self) -> np.ndarray:
+        """
+        Array of the points, in map coordinates.
+        """
+        return self._local + self._origin
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def __getitem__(self, index: int) -> Vector2:
+        x, y = self._local[index] + self._origin
+        return Vector2(int(x), int(y))
+
+    def __iter__(self):
+        for x, y in self.points:
+            yield Vector2(int(x), int(y))
+
+    def __contains__(self, point: Vector2) -> bool:
+        return (point.x - self._origin_x, point.y - self._origin_y) in self._local_set
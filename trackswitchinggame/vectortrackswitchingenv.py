@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# import built-in module
+import multiprocessing
+from multiprocessing.connection import Connection
+
+# import third-party modules
+import numpy as np
+
+# import your own module
+from trackswitchinggame.trackswitchingenv import TrackSwitchingEnv
+
+
+class VectorTrackSwitchingEnv:
+    """
+    Several TrackSwitchingEnv stepped in lockstep, with batched actions, observations and rewards.
+    Environments are stepped in this process by default. With nb_workers, they are split between as many subprocesses
+    instead, each stepping its share of the environments.
+    An environment whose episode ends is reset automatically: the observation returned for it is then the first one of
+    the new episode, and the last one of the finished episode is in its info dict, as "final_observation". Its next
+    episode is seeded with the seed of the finished one plus nb_envs, so that environments do not repeat each other's
+    episodes.
+    """
+
+    def __init__(self, level_file: str, nb_envs: int, nb_workers: int = 0, **env_kwargs):
+        self._nb_envs = nb_envs
+        # Workers keep the stride of all the environments, not only of their share
+        env_kwargs.setdefault("seed_stride", nb_envs)
+        self._envs = []
+        self._workers = []
+        self._connections = []
+        self._worker_sizes = []  # Number of environments of each worker
+        if nb_workers:
+            shares = np.array_split(np.arange(nb_envs), min(nb_workers, nb_envs))
+            for share in shares:
+                connection, worker_connection = multiprocessing.Pipe()
+                worker = multiprocessing.Process(target=self._worker, daemon=True,
+                                                 args=(worker_connection, level_file, len(share), env_kwargs))
+                worker.start()
+                worker_connection.close()
+                self._workers.append(worker)
+                self._connections.append(connection)
+                self._worker_sizes.append(len(share))
+        else:
+            self._envs = [TrackSwitchingEnv(level_file, **env_kwargs) for _ in range(nb_envs)]
+
+    def reset(self, seed: int = None) -> tuple[dict, list[dict]]:
+        """
+        Reset all environments. If seed is given, environment i is seeded with seed + i.
+        """
+        if self._workers:
+            start = 0
+            for connection, nb_envs in zip(self._connections, self._worker_sizes):
+                connection.send(("reset", None if seed is None else seed + start))
+                start += nb_envs
+            observations, infos = zip(*[connection.recv() for connection in self._connections])
+            return self._stack_batches(observations), [info for worker_infos in infos for info in worker_infos]
+        results = [env.reset(None if seed is None else seed + i) for i, env in enumerate(self._envs)]
+        return self._stack([observation for observation, _ in results]), [info for _, info in results]
+
+    def step(self, actions) -> tuple[dict, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        """
+        Apply one action per environment, and return the batched observations, rewards, terminated and truncated
+        flags, with the info dicts.
+        """
+        if self._workers:
+            start = 0
+            for connection, nb_envs in zip(self._connections, self._worker_sizes):
+                connection.send(("step", actions[start:start + nb_envs]))
+                start += nb_envs
+            results = [connection.recv() for connection in self._connections]
+            observations, rewards, terminated, truncated, infos = zip(*results)
+            return (self._stack_batches(observations), np.concatenate(rewards), np.concatenate(terminated),
+                    np.concatenate(truncated), [info for worker_infos in infos for info in worker_infos])
+
+        observations, rewards, terminated, truncated, infos = [], [], [], [], []
+        for env, action in zip(self._envs, actions):
+            observation, reward, env_terminated, env_truncated, info = env.step(int(action))
+            if env_terminated or env_truncated:
+                info["final_observation"] = observation
+                observation, _ = env.reset()
+            observations.append(observation)
+            rewards.append(reward)
+            terminated.append(env_terminated)
+            truncated.append(env_truncated)
+            infos.append(info)
+        return (self._stack(observations), np.array(rewards, dtype=np.float32), np.array(terminated),
+                np.array(truncated), infos)
+
+    def close(self):
+        for connection in self._connections:
+            connection.send(("close", None))
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        self._connections = []
+        self._worker_sizes = []
+
+    @staticmethod
+    def _stack(observations: list[dict]) -> dict:
+        return {key: np.stack([observation[key] for observation in observations]) for key in observations[0]}
+
+    @staticmethod
+    def _stack_batches(batches: list[dict]) -> dict:
+        return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+    @staticmethod
+    def _worker(connection: Connection, level_file: str, nb_envs: int, env_kwargs: dict):
+        envs = VectorTrackSwitchingEnv(level_file, nb_envs, **env_kwargs)
+        while True:
+            command, data = connection.recv()
+            if command == "reset":
+                connection.send(envs.reset(data))
+            elif command == "step":
+                connection.send(envs.step(data))
+            elif command == "nb_actions":
+                connection.send(envs.nb_actions)
+            else:
+                connection.close()
+                return
+
+    @property
+    def nb_envs(self) -> int:
+        return self._nb_envs
+
+    @property
+    def nb_actions(self) -> int:
+        """
+        Number of actions of each environment. Available after reset().
+        """
+        if self._workers:
+            self._connections[0].send(("nb_actions", None))
+            return self._connections[0].recv()
+        return self._envs[0].nb_actions
@@ -8,6 +8,7 @@ import pygame as pg
 
 # import your own module
 from trackswitchinggame.constants import *
+from trackswitchinggame.resources import Resources
 
 
 class WagonSprite(pg.sprite.Sprite):
@@ -15,27 +16,108 @@ class WagonSprite(pg.sprite.Sprite):
     Representation of a wagon.
     """
 
+    ROTATION_STEP = 1  # Rotated images are cached for angles rounded to this step, in degrees
+
+    # Rotated images shared by all wagons, keyed by (image file, flipped, quantized angle)
+    _rotation_cache = dict()
+
     def __init__(self, image, flip_wagon=False):
         super().__init__()
 
-        self._original_image = pg.image.load(image).convert_alpha()
-        if flip_wagon:
-            self._original_image = pg.transform.flip(self._original_image, True, False)
+        self._image_file = image
+        self._flip_wagon = flip_wagon
+        self._original_image = Resources.image(image, flip_wagon)
+        self.reset()
 
+    def reset(self):
+        """
+        Bring the wagon back to its initial, unrotated state.
+        """
         self.image = self._original_image
         self.rect = self.image.get_rect()
+        self.previous_rect = None  # Position at the previous simulation step, for interpolation
+        self._angle = None
 
     def update(self, position_axle_1, position_axle_2):
         diff_vector = position_axle_1 - position_axle_2
         angle = math.atan(diff_vector.y / diff_vector.x) / math.pi * 180
-        self.image = pg.transform.rotate(self._original_image, -angle)
+        self.place(angle, (position_axle_1.x + position_axle_2.x) / 2, (position_axle_1.y + position_axle_2.y) / 2)
+
+    def place(self, angle: float, centerx: float, centery: float):
+        """
+        Rotate the wagon by angle (in degrees) and center it on (centerx, centery).
+        """
+        self.image = self._rotated_image(angle)
         self.rect = self.image.get_rect()
+        self._angle = angle
 
         if DEBUG:
+            # Rotated images are shared, draw on a copy
+            self.image = self.image.copy()
             pg.draw.rect(self.image, pg.Color("lightcoral"), self.rect, width=1)
 
-        self.rect.centerx = (position_axle_1.x + position_axle_2.x) / 2
-        self.rect.centery = (position_axle_1.y + position_axle_2.y) / 2
+        self.rect.centerx = centerx
+        self.rect.centery = centery
+
+    def overlaps(self, other: "WagonSprite", margin: float = 0) -> bool:
+        """
+        Check if the footprints of two wagons overlap: with a positive margin, if they are less than margin apart, and
+        with a negative one, if they overlap by more than -margin. Unlike their rects, which bound the rotated images,
+        footprints do not include the empty corners of the images.
+        """
+        footprint, other_footprint = self.footprint, other.footprint
+        # Separating axis test: rectangles are disjoint if their projections on one of their edges are
+        for corners in (footprint, other_footprint):
+            for edge in (corners[1] - corners[0], corners[3] - corners[0]):
+                axis = edge.normalize()
+                projections = [axis.dot(corner) for corner in footprint]
+                other_projections = [axis.dot(corner) for corner in other_footprint]
+                if max(projections) + margin <= min(other_projections) or \
+                        max(other_projections) + margin <= min(projections):
+                    return False
+        return True
+
+    def interpolated_rect(self, alpha: float) -> pg.Rect:
+        """
+        Rect of the wagon at alpha between its previous and current position.
+        """
+        if self.previous_rect is None or alpha >= 1:
+            return self.rect
+        rect = self.rect.copy()
+        rect.center = pg.Vector2(self.previous_rect.center).lerp(self.rect.center, alpha)
+        return rect
+
+    def __getstate__(self) -> dict:
+        # Images are shared between wagons, and copies get them back from the caches
+        state = self.__dict__.copy()
+        state.update(image=None, _original_image=None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._original_image = Resources.image(self._image_file, self._flip_wagon)
+        self.image = self._original_image if self._angle is None else self._rotated_image(self._angle)
+
+    def _rotated_image(self, angle: float) -> pg.Surface:
+        quantized_angle = round(angle / self.ROTATION_STEP) * self.ROTATION_STEP
+        key = (self._image_file, self._flip_wagon, quantized_angle)
+        try:
+            return self._rotation_cache[key]
+        except KeyError:
+            rotated_image = pg.transform.rotate(self._original_image, -quantized_angle)
+            self._rotation_cache[key] = rotated_image
+            return rotated_image
+
+    @property
+    def footprint(self) -> list[pg.Vector2]:
+        """
+        Corners of the wagon, rotated as placed on the track and centered on its rect.
+        """
+        center = pg.Vector2(self.rect.x + self.rect.width / 2, self.rect.y + self.rect.height / 2)
+        half_length = pg.Vector2(self._original_image.get_width() / 2, 0).rotate(self._angle or 0)
+        half_width = pg.Vector2(0, self._original_image.get_height() / 2).rotate(self._angle or 0)
+        return [center - half_length - half_width, center + half_length - half_width,
+                center + half_length + half_width, center - half_length + half_width]
 
     @property
     def length(self) -> int: